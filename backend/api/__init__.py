@@ -3,9 +3,8 @@
 Exports blueprints for external imports.
 """
 
-try:
-    from backend.api.routes import main_bp, api_bp  # type: ignore
-except Exception:  # pragma: no cover - fallback when running from backend cwd
-    from api.routes import main_bp, api_bp  # type: ignore
+# Relative import so the routes module (and its service singletons) is only
+# ever loaded once, under the same package name as this one.
+from .routes import main_bp, api_bp
 
 __all__ = ["main_bp", "api_bp"]
@@ -1,34 +1,60 @@
-from flask import Blueprint, request, jsonify, current_app, redirect
+from flask import Blueprint, Response, request, jsonify, current_app, redirect
+from sqlalchemy import select
+import orjson
 try:
     from backend.models import User, StockRecommendation, NewsArticle
 except Exception:  # pragma: no cover - fallback when running from backend cwd
     from models import User, StockRecommendation, NewsArticle
 
 try:
-    from backend.services.stock_service import StockService
-    from backend.services.news_service import NewsService
+    from backend.services.stock_service import stock_service
+    from backend.services.news_service import news_service
     from backend.services.recommendation_service import RecommendationService
     from backend.services.email_service import EmailService
 except Exception:  # pragma: no cover - fallback when running from backend cwd
-    from services.stock_service import StockService
-    from services.news_service import NewsService
+    from services.stock_service import stock_service
+    from services.news_service import news_service
     from services.recommendation_service import RecommendationService
     from services.email_service import EmailService
+
+try:
+    from backend.cache import cached_bytes, invalidate_prefix
+except Exception:  # pragma: no cover - fallback when running from backend cwd
+    from cache import cached_bytes, invalidate_prefix
 import logging
 from apscheduler.schedulers.background import BackgroundScheduler
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import atexit
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Create blueprints
 main_bp = Blueprint('main', __name__)
 api_bp = Blueprint('api', __name__)
 
-# Initialize services
-stock_service = StockService()
-news_service = NewsService()
+# News changes often, so keep cached API responses short-lived
+NEWS_CACHE_TTL = 120
+
+# Constant payloads are encoded once. A fresh Response is still built per
+# request because after_request hooks (CORS) mutate response headers.
+_HEALTH_BODY = orjson.dumps({'status': 'healthy', 'service': 'stock-recommendation-api'})
+_CATEGORIES_BODY = orjson.dumps({
+    'success': True,
+    'categories': [
+        'latest', 'markets', 'business', 'tech'
+    ]
+})
+
+# Services are created lazily on first use so importing this module stays
+# cheap and each worker builds its own instances after fork
+@lru_cache(maxsize=1)
+def get_recommendation_service():
+    return RecommendationService()
+
+@lru_cache(maxsize=1)
+def get_email_service():
+    return EmailService()
 
 # Background scheduler to refresh news cache regularly
 _scheduler = BackgroundScheduler(daemon=True)
@@ -37,9 +63,11 @@ def _refresh_news_cache():
     try:
         logger.info("Refreshing news cache via scheduler...")
         news_service.get_latest_news(limit=20, force=True)
+        # Drop the encoded responses too, or they keep serving the old news until they expire
+        invalidate_prefix("news_body:")
         logger.info("News cache refresh completed")
     except Exception as e:
-        logger.error(f"News cache refresh failed: {e}")
+        logger.error("News cache refresh failed: %s", e)
 
 # Start the scheduler only once (avoid heavy work during import/startup)
 try:
@@ -49,9 +77,27 @@ try:
         _scheduler.start()
         atexit.register(lambda: _scheduler.shutdown(wait=False))
 except Exception as _e:
-    logger.warning(f"Scheduler did not start: {_e}")
-recommendation_service = RecommendationService()
-email_service = EmailService()
+    logger.warning("Scheduler did not start: %s", _e)
+
+# SMTP round-trips are slow, so confirmation emails are sent off the request path.
+# Shutdown waits for queued emails so a recycled worker doesn't drop them.
+_email_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='email')
+atexit.register(lambda: _email_executor.shutdown(wait=True))
+
+def _log_email_result(future):
+    try:
+        if not future.result():
+            logger.warning("Confirmation email was not sent")
+    except Exception as e:
+        logger.error("Confirmation email failed: %s", e)
+
+def ojson(obj, status=200):
+    """Serialize obj with orjson; handles numpy values from the ML models natively."""
+    return Response(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype='application/json'
+    )
 
 def get_db():
     """Get SQLAlchemy db instance safely without circular imports."""
@@ -90,13 +136,16 @@ def subscribe():
         # Get db instance
         db = get_db()
         
-        # Check if user already exists
-        existing_user = User.query.filter_by(email=email).first()
+        # Check if user already exists (column-only lookup on the email index)
+        existing_user = db.session.execute(
+            select(User.id, User.is_active).where(User.email == email)
+        ).first()
         if existing_user:
             if existing_user.is_active:
                 return jsonify({'success': True, 'message': 'Email already subscribed'}), 200
             else:
-                existing_user.is_active = True
+                user = db.session.get(User, existing_user.id)
+                user.is_active = True
                 db.session.commit()
                 return jsonify({'success': True, 'message': 'Subscription reactivated successfully'}), 200
         
@@ -105,16 +154,17 @@ def subscribe():
         db.session.add(new_user)
         db.session.commit()
         
-        # Send confirmation email
+        # Send confirmation email in the background
         try:
-            email_service.send_confirmation_email(email)
+            future = _email_executor.submit(get_email_service().send_confirmation_email, email)
+            future.add_done_callback(_log_email_result)
         except Exception as e:
-            logger.warning(f"Failed to send confirmation email: {e}")
+            logger.warning("Failed to queue confirmation email: %s", e)
         
         return jsonify({'success': True, 'message': 'Subscription successful!'}), 201
         
     except Exception as e:
-        logger.error(f"Error in subscription: {e}")
+        logger.error("Error in subscription: %s", e)
         try:
             db.session.rollback()
         except Exception:
@@ -135,16 +185,21 @@ def unsubscribe():
         # Get db instance
         db = get_db()
         
-        user = User.query.filter_by(email=email).first()
-        if user:
-            user.is_active = False
-            db.session.commit()
+        existing_user = db.session.execute(
+            select(User.id, User.is_active).where(User.email == email)
+        ).first()
+        if existing_user:
+            # Only load and write the row when there is something to change
+            if existing_user.is_active:
+                user = db.session.get(User, existing_user.id)
+                user.is_active = False
+                db.session.commit()
             return jsonify({'success': True, 'message': 'Unsubscribed successfully'}), 200
         else:
             return jsonify({'success': False, 'error': 'Email not found'}), 404
             
     except Exception as e:
-        logger.error(f"Error in unsubscription: {e}")
+        logger.error("Error in unsubscription: %s", e)
         try:
             db.session.rollback()
         except Exception:
@@ -158,15 +213,15 @@ def get_news():
         category = request.args.get('category', 'latest')
         limit = int(request.args.get('limit', 15))
         
-        news = news_service.get_news(category=category, limit=limit)
+        def build_body():
+            news = news_service.get_news(category=category, limit=limit)
+            return orjson.dumps({'success': True, 'news': news, 'count': len(news)})
         
-        return jsonify({
-            'success': True,
-            'news': news,
-            'count': len(news)
-        })
+        # The encoded body is cached, so cache hits skip JSON decode/encode entirely
+        body = cached_bytes(f"news_body:{category}:{limit}", NEWS_CACHE_TTL, build_body)
+        return Response(body, mimetype='application/json')
     except Exception as e:
-        logger.error(f"Error fetching news: {e}")
+        logger.error("Error fetching news: %s", e)
         return jsonify({
             'success': False,
             'error': 'Failed to fetch news'
@@ -179,7 +234,7 @@ def refresh_news_now():
         _refresh_news_cache()
         return jsonify({'success': True}), 200
     except Exception as e:
-        logger.error(f"Manual news refresh failed: {e}")
+        logger.error("Manual news refresh failed: %s", e)
         return jsonify({'success': False, 'error': 'Failed to refresh'}), 500
 
 @api_bp.route('/recommendations', methods=['GET'])
@@ -187,14 +242,19 @@ def get_recommendations():
     """Get stock recommendations"""
     try:
         symbol = request.args.get('symbol')
-        if symbol:
-            recommendations = recommendation_service.get_recommendations_for_symbol(symbol)
+        symbols = request.args.get('symbols')
+        if symbols:
+            recommendations = get_recommendation_service().get_recommendations_for_symbols(
+                [s.strip() for s in symbols.split(',') if s.strip()]
+            )
+        elif symbol:
+            recommendations = get_recommendation_service().get_recommendations_for_symbol(symbol)
         else:
-            recommendations = recommendation_service.get_latest_recommendations()
+            recommendations = get_recommendation_service().get_latest_recommendations()
         
-        return jsonify({'recommendations': recommendations})
+        return ojson({'recommendations': recommendations})
     except Exception as e:
-        logger.error(f"Error fetching recommendations: {e}")
+        logger.error("Error fetching recommendations: %s", e)
         return jsonify({'error': 'Failed to fetch recommendations'}), 500
 
 @api_bp.route('/stock/<symbol>', methods=['GET'])
@@ -202,34 +262,34 @@ def get_stock_data(symbol):
     """Get stock data and recommendation for a specific symbol"""
     try:
         stock_data = stock_service.get_stock_data(symbol)
-        recommendation = recommendation_service.get_recommendation_for_symbol(symbol)
+        recommendation = get_recommendation_service().get_recommendation_for_symbol(symbol)
         
-        return jsonify({
+        return ojson({
             'symbol': symbol,
             'stock_data': stock_data,
             'recommendation': recommendation
         })
     except Exception as e:
-        logger.error(f"Error fetching stock data for {symbol}: {e}")
+        logger.error("Error fetching stock data for %s: %s", symbol, e)
         return jsonify({'error': f'Failed to fetch data for {symbol}'}), 500
 
 @api_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'service': 'stock-recommendation-api'})
+    return Response(_HEALTH_BODY, mimetype='application/json')
 
 @api_bp.route('/news/markets', methods=['GET'])
 def get_market_news():
     """Get stock market specific news - API endpoint"""
     try:
-        news = news_service.get_market_news()
-        
-        return jsonify({
-            'success': True,
-            'news': news
-        })
+        body = cached_bytes(
+            "news_body:markets",
+            NEWS_CACHE_TTL,
+            lambda: orjson.dumps({'success': True, 'news': news_service.get_market_news()})
+        )
+        return Response(body, mimetype='application/json')
     except Exception as e:
-        logger.error(f"Error fetching market news: {e}")
+        logger.error("Error fetching market news: %s", e)
         return jsonify({
             'success': False,
             'error': 'Failed to fetch market news'
@@ -238,9 +298,4 @@ def get_market_news():
 @api_bp.route('/news/categories', methods=['GET'])
 def get_news_categories():
     """Get available news categories"""
-    return jsonify({
-        'success': True,
-        'categories': [
-            'latest', 'markets', 'business', 'tech'
-        ]
-    })
+    return Response(_CATEGORIES_BODY, mimetype='application/json')
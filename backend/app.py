@@ -1,14 +1,33 @@
 from flask import Flask
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import logging
 import os
+import sqlite3
 
 # Initialize extensions first (without app context)
 db = SQLAlchemy()
 
+@event.listens_for(Engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL so SQLite readers don't block on writers (local/default DB only)."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
 def create_app():
     app = Flask(__name__)
     
+    # Configure logging once for the whole app (no-op if already configured)
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper())
+    
     # Load configuration
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-here')
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///stock_recommendations.db')
@@ -18,7 +37,20 @@ def create_app():
         abs_path = os.path.join(os.path.dirname(__file__), db_path)
         app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{abs_path}'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    
+
+    # Connection pool tuning; pre_ping drops stale Postgres connections before use
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        from sqlalchemy.pool import NullPool
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'poolclass': NullPool}
+    else:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'pool_size': int(os.getenv('DB_POOL_SIZE', '20')),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '20')),
+            'pool_timeout': 30,
+            'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+            'pool_pre_ping': True
+        }
+
     # Initialize extensions with app
     db.init_app(app)
     CORS(app)
@@ -1,30 +1,74 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
+from apscheduler.schedulers.background import BackgroundScheduler
+from datetime import datetime
 import feedparser
+import threading
+import atexit
+
+try:
+    from backend.cache import cached_json
+except Exception:  # pragma: no cover - fallback when running from backend cwd
+    from cache import cached_json
 
 app = Flask(__name__)
 CORS(app)
 
+# Latest parsed news, refreshed in the background so requests never block on RSS
+_latest_news = []
+_news_lock = threading.Lock()
+
 @app.route('/')
 def home():
     return jsonify({"message": "Stock Recommendation API"})
 
+def _fetch_news():
+    feed = feedparser.parse("https://www.moneycontrol.com/rss/latestnews.xml")
+    news_items = []
+
+    for entry in feed.entries[:10]:
+        news_items.append({
+            'title': entry.title,
+            'link': entry.link,
+            'summary': entry.get('summary', ''),
+            'published': entry.get('published', ''),
+            'source': 'MoneyControl'
+        })
+
+    return news_items
+
+def _refresh_news():
+    global _latest_news
+    try:
+        news_items = cached_json("simple_news:latest", 60, _fetch_news)
+    except Exception as e:
+        print(f"News refresh failed: {e}")
+        return
+    with _news_lock:
+        _latest_news = news_items
+
+_scheduler = BackgroundScheduler(daemon=True)
+try:
+    _scheduler.add_job(_refresh_news, 'interval', seconds=60, id='refresh_news',
+                       next_run_time=datetime.now(), replace_existing=True)
+    _scheduler.start()
+    atexit.register(lambda: _scheduler.shutdown(wait=False))
+except Exception as _e:
+    print(f"Scheduler did not start: {_e}")
+
 @app.route('/api/news')
 def get_news():
     """Simple news endpoint without database"""
     try:
-        feed = feedparser.parse("https://www.moneycontrol.com/rss/latestnews.xml")
-        news_items = []
-        
-        for entry in feed.entries[:10]:
-            news_items.append({
-                'title': entry.title,
-                'link': entry.link,
-                'summary': entry.get('summary', ''),
-                'published': entry.get('published', ''),
-                'source': 'MoneyControl'
-            })
-        
+        with _news_lock:
+            news_items = _latest_news
+
+        # Cold start: the first background refresh has not finished yet
+        if not news_items:
+            _refresh_news()
+            with _news_lock:
+                news_items = _latest_news
+
         return jsonify({
             'success': True,
             'news': news_items
@@ -42,4 +86,4 @@ def health():
 if __name__ == '__main__':
     import os
     port = int(os.getenv('PORT', '5000'))
-    app.run(host='0.0.0.0', port=port)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port)
@@ -0,0 +1,190 @@
+"""Small Redis-backed read-through cache.
+
+Without REDIS_URL, a diskcache directory named by CACHE_DIR is used instead,
+which still shares entries between workers on one host and survives restarts.
+Caching is skipped entirely when neither is configured (or the client library
+is not installed), so the app keeps working without either.
+"""
+import logging
+import os
+import pickle
+import threading
+from concurrent.futures import Future
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_checked = False
+
+# Loads currently running in this process, keyed by cache key
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+class _DiskCacheClient:
+    """Adapts a diskcache.Cache to the get/setex calls used for Redis."""
+
+    def __init__(self, directory):
+        import diskcache
+        self._cache = diskcache.Cache(directory)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def setex(self, key, ttl, value):
+        self._cache.set(key, value, expire=ttl)
+
+    def delete(self, key):
+        self._cache.delete(key)
+
+    def scan_iter(self, match):
+        # Only the trailing '*' wildcard is used here
+        prefix = match.rstrip('*')
+        return [key for key in self._cache.iterkeys() if isinstance(key, str) and key.startswith(prefix)]
+
+
+def get_redis():
+    """Return a shared cache client (Redis or diskcache), or None when caching is disabled."""
+    global _client, _client_checked
+    if _client_checked:
+        return _client
+    _client_checked = True
+
+    redis_url = os.getenv('REDIS_URL')
+    if not redis_url:
+        cache_dir = os.getenv('CACHE_DIR')
+        if cache_dir:
+            try:
+                _client = _DiskCacheClient(cache_dir)
+            except ImportError:
+                logger.warning("diskcache library not available, caching disabled")
+            except Exception as e:
+                logger.warning(f"Could not open disk cache at {cache_dir}: {e}")
+        return _client
+    try:
+        import redis
+        _client = redis.Redis.from_url(redis_url, socket_timeout=1)
+    except ImportError:
+        logger.warning("redis library not available, caching disabled")
+    except Exception as e:
+        logger.warning(f"Could not connect to Redis: {e}")
+    return _client
+
+
+def coalesce(key, loader):
+    """Call loader() once for concurrent callers of the same key.
+
+    The first caller runs it; callers arriving while it runs wait and get the
+    same result (or exception), so a burst of misses makes one upstream call.
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        return future.result()
+
+    try:
+        future.set_result(loader())
+    except BaseException as e:
+        future.set_exception(e)
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+    return future.result()
+
+
+def _cached(key, ttl, loader, dumps, loads):
+    client = get_redis()
+    if client is not None:
+        try:
+            cached = client.get(key)
+            if cached is not None:
+                return loads(cached)
+        except Exception as e:
+            logger.warning(f"Cache read failed for {key}: {e}")
+
+    def load():
+        value = loader()
+        if client is not None:
+            try:
+                client.setex(key, ttl, dumps(value))
+            except Exception as e:
+                logger.warning(f"Cache write failed for {key}: {e}")
+        return value
+
+    return coalesce(key, load)
+
+
+def cached_json(key, ttl, loader, default=None):
+    """Return the cached value for key, calling loader() and caching it on a miss.
+
+    Values are encoded with orjson (NumPy arrays/scalars and datetimes included);
+    ``default`` is called for any other type it cannot encode natively.
+    """
+    return _cached(
+        key, ttl, loader,
+        lambda value: orjson.dumps(value, default=default, option=orjson.OPT_SERIALIZE_NUMPY),
+        orjson.loads
+    )
+
+
+def get_json(key):
+    """Return the cached orjson value for key, or None on a miss or when caching is off."""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        cached = client.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+    return None
+
+
+def set_json(key, ttl, value, default=None):
+    """Store value under key the same way cached_json does on a miss."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.setex(key, ttl, orjson.dumps(value, default=default, option=orjson.OPT_SERIALIZE_NUMPY))
+    except Exception as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+
+def cached_pickle(key, ttl, loader):
+    """Like cached_json, but for values such as DataFrames that need pickling."""
+    return _cached(key, ttl, loader, pickle.dumps, pickle.loads)
+
+
+def cached_bytes(key, ttl, loader):
+    """Like cached_json, but for values that are already encoded (e.g. response bodies)."""
+    return _cached(key, ttl, loader, bytes, bytes)
+
+
+def invalidate(key):
+    """Drop a cached entry so the next read calls its loader again."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.delete(key)
+    except Exception as e:
+        logger.warning(f"Cache delete failed for {key}: {e}")
+
+
+def invalidate_prefix(prefix):
+    """Drop every cached entry whose key starts with prefix."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        for key in client.scan_iter(match=f"{prefix}*"):
+            client.delete(key)
+    except Exception as e:
+        logger.warning(f"Cache delete failed for {prefix}*: {e}")
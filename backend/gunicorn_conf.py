@@ -0,0 +1,31 @@
+"""Gunicorn configuration for production.
+
+Uses gevent workers so blocking I/O in the news and stock services
+(RSS feeds, Yahoo Finance, SMTP) overlaps across requests instead of
+tying up a whole worker. Gunicorn monkey-patches the standard library
+for gevent workers before the app is imported.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = 'gevent'
+# gevent already overlaps requests within a worker, and every worker runs its own
+# news scheduler, feed prefetch and in-process news cache, so keep the count small
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+worker_connections = int(os.getenv('WORKER_CONNECTIONS', '1000'))
+timeout = 60
+
+
+def post_worker_init(worker):
+    """Warm the price model, indicator kernel and news cache in each worker before it starts serving requests."""
+    if os.getenv('WARMUP', '1') != '1':
+        return
+    from ml_models.price_predictor import warm_up
+    warm_up()
+    from services import stock_service
+    stock_service.warm_up()
+
+    # Fetch the feeds in the background so the first news request hits a warm cache
+    import threading
+    from services.news_service import news_service
+    threading.Thread(target=news_service.get_latest_news, kwargs={'limit': 20}, daemon=True).start()
@@ -1,7 +1,5 @@
 # ML Models package initialization
-# backend/models/__init__.py
+# backend/ml_models/__init__.py
 from .user import User
-from .stock_recommendation import StockRecommendation
-from .news_article import NewsArticle
 
-__all__ = ['User', 'StockRecommendation', 'NewsArticle']
+__all__ = ['User']
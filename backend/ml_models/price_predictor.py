@@ -2,61 +2,129 @@ import logging
 from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 import os
 import pickle
-from services.stock_service import StockService
+from services.stock_service import stock_service
+
+try:
+    from backend.cache import cached_json
+except Exception:
+    from cache import cached_json
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; run the same code as plain NumPy
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
 
 logger = logging.getLogger(__name__)
 
+# Repeat lookups for the same symbol within this window reuse the prediction
+PREDICTION_CACHE_TTL = 900
+
+@njit(cache=True)
+def _stat_core(close: np.ndarray) -> Tuple[float, float, float, float]:
+    """Return (sma_5, sma_20, volatility, trend) for a closing-price array.
+
+    Matches the pandas rolling/pct_change/std results, including NaN when
+    there are not enough prices for a window.
+    """
+    n = close.shape[0]
+    sma_5 = close[-5:].mean() if n >= 5 else np.nan
+    sma_20 = close[-20:].mean() if n >= 20 else np.nan
+    
+    # Sample standard deviation of daily returns
+    volatility = np.nan
+    if n >= 3:
+        returns = (close[1:] - close[:-1]) / close[:-1]
+        mean = returns.mean()
+        volatility = np.sqrt(((returns - mean) ** 2).sum() / (n - 2))
+    
+    trend = (sma_5 - sma_20) / sma_20
+    return sma_5, sma_20, volatility, trend
+
+@lru_cache(maxsize=1)
+def _load_model_files() -> Tuple[Any, Any]:
+    """Load the pickled model and scaler once per process.
+
+    Returns (None, None) when no pre-trained model is available.
+    """
+    try:
+        # Try to load pre-trained model
+        model_path = os.path.join(os.path.dirname(__file__), 'models', 'price_predictor.pkl')
+        scaler_path = os.path.join(os.path.dirname(__file__), 'models', 'price_scaler.pkl')
+        
+        if os.path.exists(model_path) and os.path.exists(scaler_path):
+            with open(model_path, 'rb') as f:
+                model = pickle.load(f)
+            with open(scaler_path, 'rb') as f:
+                scaler = pickle.load(f)
+            logger.info("Price prediction model loaded successfully")
+            return model, scaler
+        
+        logger.info("No pre-trained model found, using statistical prediction")
+        
+    except Exception as e:
+        logger.error("Error loading price prediction model: %s", e)
+    
+    return None, None
+
+def warm_up() -> None:
+    """Load the model and run one dummy pass so the first request pays no cold-start cost"""
+    try:
+        _stat_core(np.linspace(1.0, 2.0, 30))
+        model, scaler = _load_model_files()
+        if model is not None:
+            n_features = getattr(scaler, 'n_features_in_', 15)
+            model.predict(scaler.transform(np.zeros((1, n_features), dtype=np.float32)))
+        logger.info("Price predictor warmed up")
+    except Exception as e:
+        logger.warning("Price predictor warm-up failed: %s", e)
+
 class PricePredictor:
     def __init__(self):
         self.model = None
         self.scaler = None
         self.is_loaded = False
-        self.stock_service = StockService()
+        self.stock_service = stock_service
         self._load_model()
         
     def _load_model(self):
-        """Load the price prediction model"""
-        try:
-            # Try to load pre-trained model
-            model_path = os.path.join(os.path.dirname(__file__), 'models', 'price_predictor.pkl')
-            scaler_path = os.path.join(os.path.dirname(__file__), 'models', 'price_scaler.pkl')
-            
-            if os.path.exists(model_path) and os.path.exists(scaler_path):
-                with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                with open(scaler_path, 'rb') as f:
-                    self.scaler = pickle.load(f)
-                self.is_loaded = True
-                logger.info("Price prediction model loaded successfully")
-            else:
-                logger.info("No pre-trained model found, using statistical prediction")
-                self.is_loaded = False
-                
-        except Exception as e:
-            logger.error(f"Error loading price prediction model: {e}")
-            self.is_loaded = False
+        """Load the price prediction model (shared across instances)"""
+        self.model, self.scaler = _load_model_files()
+        self.is_loaded = self.model is not None
     
     def predict_price(self, symbol: str, days_ahead: int = 5) -> Dict[str, Any]:
         """Predict stock price for the next N days"""
         try:
-            if self.is_loaded and self.model:
-                return self._predict_with_ml_model(symbol, days_ahead)
-            else:
-                return self._predict_with_statistics(symbol, days_ahead)
+            key = f"pred:{symbol}:{days_ahead}:{date.today().isoformat()}"
+            return cached_json(
+                key,
+                PREDICTION_CACHE_TTL,
+                lambda: self._predict_uncached(symbol, days_ahead),
+                default=float
+            )
                 
         except Exception as e:
-            logger.error(f"Error predicting price for {symbol}: {e}")
+            logger.error("Error predicting price for %s: %s", symbol, e)
             return self._get_default_prediction(symbol)
     
+    def _predict_uncached(self, symbol: str, days_ahead: int) -> Dict[str, Any]:
+        """Run the ML model when available, otherwise the statistical fallback"""
+        if self.is_loaded and self.model:
+            return self._predict_with_ml_model(symbol, days_ahead)
+        return self._predict_with_statistics(symbol, days_ahead)
+    
     def _predict_with_ml_model(self, symbol: str, days_ahead: int) -> Dict[str, Any]:
         """Predict using trained ML model"""
         try:
             # Get historical data
             hist_data = self.stock_service.get_historical_data(symbol, days=60)
-            if hist_data.empty:
+            if not len(hist_data['Close']):
                 return self._predict_with_statistics(symbol, days_ahead)
             
             # Prepare features
@@ -73,7 +141,7 @@ class PricePredictor:
             
             # Calculate confidence and direction
             confidence = self._calculate_ml_confidence(features)
-            current_price = hist_data['Close'].iloc[-1]
+            current_price = hist_data['Close'][-1]
             direction = 'up' if predicted_price > current_price else 'down'
             
             return {
@@ -88,7 +156,7 @@ class PricePredictor:
             }
             
         except Exception as e:
-            logger.error(f"ML prediction failed: {e}")
+            logger.error("ML prediction failed: %s", e)
             return self._predict_with_statistics(symbol, days_ahead)
     
     def _predict_with_statistics(self, symbol: str, days_ahead: int) -> Dict[str, Any]:
@@ -96,21 +164,14 @@ class PricePredictor:
         try:
             # Get historical data
             hist_data = self.stock_service.get_historical_data(symbol, days=30)
-            if hist_data.empty:
+            close = hist_data['Close']
+            if not len(close):
                 return self._get_default_prediction(symbol)
             
-            current_price = hist_data['Close'].iloc[-1]
-            
-            # Calculate moving averages
-            sma_5 = hist_data['Close'].rolling(window=5).mean().iloc[-1]
-            sma_20 = hist_data['Close'].rolling(window=20).mean().iloc[-1]
-            
-            # Calculate volatility
-            returns = hist_data['Close'].pct_change().dropna()
-            volatility = returns.std()
+            current_price = close[-1]
             
-            # Calculate trend
-            trend = (sma_5 - sma_20) / sma_20
+            # Moving averages, volatility and trend in one compiled pass
+            sma_5, sma_20, volatility, trend = _stat_core(close)
             
             # Simple prediction based on trend and volatility
             if trend > 0.02:  # Strong upward trend
@@ -145,63 +206,53 @@ class PricePredictor:
             }
             
         except Exception as e:
-            logger.error(f"Statistical prediction failed: {e}")
+            logger.error("Statistical prediction failed: %s", e)
             return self._get_default_prediction(symbol)
     
-    def _prepare_features(self, hist_data: pd.DataFrame) -> Optional[np.ndarray]:
+    def _prepare_features(self, hist_data: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
         """Prepare features for ML model"""
         try:
-            if len(hist_data) < 20:
+            close = hist_data['Close']
+            volume = hist_data['Volume']
+            if len(close) < 20:
                 return None
             
-            # Calculate technical indicators
-            features = []
-            
-            # Price features
-            features.extend([
-                hist_data['Close'].iloc[-1],  # Current price
-                hist_data['Close'].iloc[-5],  # 5 days ago
-                hist_data['Close'].iloc[-10], # 10 days ago
-                hist_data['Close'].iloc[-20], # 20 days ago
-            ])
+            # Only the trailing windows are needed
+            returns = np.diff(close) / close[:-1]
             
             # Moving averages
-            sma_5 = hist_data['Close'].rolling(window=5).mean()
-            sma_10 = hist_data['Close'].rolling(window=10).mean()
-            sma_20 = hist_data['Close'].rolling(window=20).mean()
-            
-            features.extend([
-                sma_5.iloc[-1],
-                sma_10.iloc[-1],
-                sma_20.iloc[-1],
-                sma_5.iloc[-1] - sma_20.iloc[-1],  # MA difference
-            ])
-            
-            # Volume features
-            features.extend([
-                hist_data['Volume'].iloc[-1],
-                hist_data['Volume'].rolling(window=5).mean().iloc[-1],
-                hist_data['Volume'].rolling(window=20).mean().iloc[-1],
-            ])
-            
-            # Volatility features
-            returns = hist_data['Close'].pct_change().dropna()
-            features.extend([
-                returns.std(),
-                returns.rolling(window=10).std().iloc[-1],
-                returns.rolling(window=20).std().iloc[-1],
-            ])
-            
-            # RSI
-            delta = hist_data['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            features.append(rsi.iloc[-1])
-            
-            # Convert to numpy array
-            features = np.array(features, dtype=np.float32)
+            sma_5 = close[-5:].mean()
+            sma_10 = close[-10:].mean()
+            sma_20 = close[-20:].mean()
+            
+            # RSI over the last 14 price changes
+            delta = np.diff(close[-15:])
+            gain = np.clip(delta, 0, None).mean()
+            loss = -np.clip(delta, None, 0).mean()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rsi = 100 - (100 / (1 + gain / loss))
+            
+            features = np.array([
+                # Price features
+                close[-1],   # Current price
+                close[-5],   # 5 days ago
+                close[-10],  # 10 days ago
+                close[-20],  # 20 days ago
+                # Moving averages
+                sma_5,
+                sma_10,
+                sma_20,
+                sma_5 - sma_20,  # MA difference
+                # Volume features
+                volume[-1],
+                volume[-5:].mean(),
+                volume[-20:].mean(),
+                # Volatility features (sample std, matching pandas)
+                returns.std(ddof=1),
+                returns[-10:].std(ddof=1),
+                returns[-20:].std(ddof=1) if len(returns) >= 20 else np.nan,
+                rsi,
+            ], dtype=np.float32)
             
             # Handle NaN values
             if np.any(np.isnan(features)):
@@ -210,7 +261,7 @@ class PricePredictor:
             return features
             
         except Exception as e:
-            logger.error(f"Error preparing features: {e}")
+            logger.error("Error preparing features: %s", e)
             return None
     
     def _calculate_ml_confidence(self, features: np.ndarray) -> float:
@@ -240,7 +291,7 @@ class PricePredictor:
             return min(0.9, max(0.3, confidence))
             
         except Exception as e:
-            logger.error(f"Error calculating ML confidence: {e}")
+            logger.error("Error calculating ML confidence: %s", e)
             return 0.5
     
     def _get_default_prediction(self, symbol: str) -> Dict[str, Any]:
@@ -259,7 +310,7 @@ class PricePredictor:
     def train_model(self, symbol: str, days: int = 365) -> bool:
         """Train the price prediction model (placeholder for future implementation)"""
         try:
-            logger.info(f"Training price prediction model for {symbol}")
+            logger.info("Training price prediction model for %s", symbol)
             # This is a placeholder - in production you would:
             # 1. Collect more historical data
             # 2. Implement LSTM/GRU model training
@@ -269,7 +320,7 @@ class PricePredictor:
             return True
             
         except Exception as e:
-            logger.error(f"Error training model: {e}")
+            logger.error("Error training model: %s", e)
             return False
     
     def get_prediction_history(self, symbol: str, days: int = 30) -> List[Dict[str, Any]]:
@@ -280,9 +331,14 @@ class PricePredictor:
             return []
             
         except Exception as e:
-            logger.error(f"Error getting prediction history: {e}")
+            logger.error("Error getting prediction history: %s", e)
             return []
     
     def is_model_available(self) -> bool:
         """Check if the ML model is available"""
         return self.is_loaded
+
+@lru_cache(maxsize=1)
+def get_price_predictor() -> PricePredictor:
+    """Return the process-wide PricePredictor"""
+    return PricePredictor()
@@ -1,33 +1,159 @@
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 import os
+import re
+import hashlib
+import sqlite3
+import threading
+from collections import Counter, OrderedDict, deque
+from functools import lru_cache
 import numpy as np
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# FinBERT model specifically trained for financial text
+FINBERT_MODEL_NAME = "ProsusAI/finbert"
+MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', os.path.join(os.path.dirname(__file__), 'cache'))
+SENTIMENT_CACHE_DB = os.getenv('SENTIMENT_CACHE_DB', os.path.join(MODEL_CACHE_DIR, 'sentiment_cache.db'))
+
+# ONNX Runtime threads per process; by default the cores are split across the
+# gunicorn workers so each host runs about cpu_count threads in total
+ORT_NUM_THREADS = int(os.getenv(
+    'ORT_NUM_THREADS',
+    max(1, (os.cpu_count() or 1) // int(os.getenv('WEB_CONCURRENCY', '2')))
+))
+
+# Headlines used to check that the INT8 model still agrees with the FP32 one
+_QUANTIZATION_CHECK_TEXTS = [
+    "Shares surge after the company beats quarterly earnings estimates",
+    "Stock plunges as revenue misses expectations and guidance is cut",
+    "The company will hold its annual general meeting next month",
+    "Profit rises sharply on strong demand and improved margins",
+    "Regulator opens investigation into accounting irregularities",
+    "Markets close flat ahead of the central bank decision",
+    "Bank reports record loan growth and higher net interest income",
+    "Firm announces layoffs amid falling sales and mounting losses",
+]
+_QUANTIZATION_MIN_AGREEMENT = 0.85
+
+# Token-length buckets for batched ONNX inference (FinBERT max is 512)
+_LENGTH_BUCKETS = (64, 128, 256, 512)
+
+# Result cache sizes: exact matches by text hash, near-duplicates by SimHash
+_EXACT_CACHE_SIZE = 4096
+_SIMHASH_WINDOW = 512
+_SIMHASH_MAX_DISTANCE = 3
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Financial-specific positive keywords
+_POSITIVE_KEYWORDS = frozenset((
+    'surge', 'jump', 'rise', 'gain', 'profit', 'earnings', 'growth',
+    'positive', 'bullish', 'rally', 'breakout', 'strong', 'up', 'higher',
+    'beat', 'exceed', 'outperform', 'recovery', 'bounce', 'climb'
+))
+
+# Financial-specific negative keywords
+_NEGATIVE_KEYWORDS = frozenset((
+    'fall', 'drop', 'decline', 'loss', 'crash', 'bearish', 'weak',
+    'negative', 'down', 'plunge', 'slump', 'concern', 'risk', 'lower',
+    'miss', 'disappoint', 'underperform', 'selloff', 'correction'
+))
+
+# Financial-specific neutral keywords
+_NEUTRAL_KEYWORDS = frozenset((
+    'stable', 'steady', 'maintain', 'hold', 'unchanged', 'flat',
+    'consolidate', 'range', 'support', 'resistance', 'technical'
+))
+
+# Label -> index for bincount; anything else lands in the unused bucket 3
+_LABEL_IDS = {'positive': 0, 'negative': 1, 'neutral': 2}
+
+# Keyword -> category index (positive, negative, neutral) for the word-level fallback
+_KEYWORD_CATEGORIES = {
+    **{word: 0 for word in _POSITIVE_KEYWORDS},
+    **{word: 1 for word in _NEGATIVE_KEYWORDS},
+    **{word: 2 for word in _NEUTRAL_KEYWORDS},
+}
+# Keywords match whole words only; a word is a run of these characters in both paths
+_WORD_RE = re.compile(r"[a-z']+")
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz'")
+
+def _build_keyword_automaton():
+    """Aho-Corasick automaton over all keywords, or None without pyahocorasick"""
+    try:
+        import ahocorasick
+    except ImportError:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for category, keywords in (('positive', _POSITIVE_KEYWORDS),
+                               ('negative', _NEGATIVE_KEYWORDS),
+                               ('neutral', _NEUTRAL_KEYWORDS)):
+        for word in keywords:
+            automaton.add_word(word, (category, word))
+    automaton.make_automaton()
+    return automaton
+
+def _simhash(text: str) -> int:
+    """64-bit SimHash over word bigrams; similar texts differ in few bits"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    shingles = [' '.join(pair) for pair in zip(tokens, tokens[1:])] or tokens
+    if not shingles:
+        return 0
+    digests = b''.join(
+        hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest() for shingle in shingles
+    )
+    # One row of 64 bits per shingle; a bit is set where most shingles set it
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+    majority = bits.sum(axis=0) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(majority).tobytes(), 'big')
+
+# Serializes model loading so concurrent cold starts don't load FinBERT twice
+_MODEL_LOAD_LOCK = threading.Lock()
+
 class SentimentAnalyzer:
     def __init__(self):
         self.model = None
         self.tokenizer = None
+        self.session = None
+        self.sentiment_pipeline = None
+        self.id2label = {}
         self.is_loaded = False
+        self._exact_cache = OrderedDict()
+        self._recent_fingerprints = deque(maxlen=_SIMHASH_WINDOW)
+        self._cache_lock = threading.Lock()
+        self._keyword_automaton = _build_keyword_automaton()
+        self._disk_lock = threading.Lock()
+        self._disk = self._open_disk_cache()
         self._load_model()
         
     def _load_model(self):
-        """Load the sentiment analysis model"""
+        """Load the sentiment analysis model (no-op once loaded)"""
+        with _MODEL_LOAD_LOCK:
+            if self.is_loaded:
+                return
+            self._load_model_locked()
+    
+    def _load_model_locked(self):
         try:
+            # Prefer an ONNX Runtime session; fall back to the PyTorch pipeline
+            if self._load_onnx_model():
+                self.is_loaded = True
+                logger.info("FinBERT ONNX model loaded successfully")
+                return
+            
             # Try to load FinBERT for financial sentiment analysis
             try:
-                from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-                
-                # Use FinBERT model specifically trained for financial text
-                model_name = "ProsusAI/finbert"
+                from transformers import pipeline
                 
                 self.sentiment_pipeline = pipeline(
                     "sentiment-analysis",
-                    model=model_name,
-                    tokenizer=model_name
+                    model=FINBERT_MODEL_NAME,
+                    tokenizer=FINBERT_MODEL_NAME
                 )
+                self.sentiment_pipeline.model = self._fuse_torch_model(self.sentiment_pipeline.model)
                 
                 self.is_loaded = True
                 logger.info("FinBERT model loaded successfully")
@@ -40,22 +166,275 @@ class SentimentAnalyzer:
             logger.error(f"Error loading sentiment model: {e}")
             self.is_loaded = False
     
-    def analyze_sentiment(self, text: str) -> Dict[str, Any]:
-        """Analyze sentiment of a single text"""
+    def _fuse_torch_model(self, model):
+        """Swap in BetterTransformer's fused attention kernels when optimum supports it"""
+        model.eval()
         try:
-            if self.is_loaded and self.sentiment_pipeline:
-                return self._analyze_with_finbert(text)
-            else:
-                return self._analyze_with_keywords(text)
+            from optimum.bettertransformer import BetterTransformer
+            model = BetterTransformer.transform(model, keep_original_model=False)
+            logger.info("FinBERT converted to BetterTransformer")
+        except Exception as e:
+            logger.info(f"BetterTransformer not applied, using the stock PyTorch model: {e}")
+        return model
+    
+    def _load_onnx_model(self) -> bool:
+        """Load FinBERT as an optimized ONNX Runtime session, exporting it on first use"""
+        try:
+            import onnxruntime as ort
+            from transformers import AutoConfig, AutoTokenizer
+        except ImportError:
+            return False
+        
+        try:
+            onnx_dir = os.path.join(MODEL_CACHE_DIR, 'finbert-onnx')
+            onnx_path = os.path.join(onnx_dir, 'model.onnx')
+            
+            if not os.path.exists(onnx_path):
+                from optimum.onnxruntime import ORTModelForSequenceClassification
+                
+                logger.info("Exporting FinBERT to ONNX (first startup only)")
+                ORTModelForSequenceClassification.from_pretrained(
+                    FINBERT_MODEL_NAME, export=True
+                ).save_pretrained(onnx_dir)
+                AutoTokenizer.from_pretrained(FINBERT_MODEL_NAME).save_pretrained(onnx_dir)
+            
+            sess_options = ort.SessionOptions()
+            sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            sess_options.intra_op_num_threads = ORT_NUM_THREADS
+            
+            self.session = ort.InferenceSession(
+                onnx_path, sess_options, providers=['CPUExecutionProvider']
+            )
+            self.tokenizer = AutoTokenizer.from_pretrained(onnx_dir)
+            self.id2label = {
+                int(i): label.lower()
+                for i, label in AutoConfig.from_pretrained(onnx_dir).id2label.items()
+            }
+            
+            # Swap in the INT8 model when enabled and it passes the agreement check
+            if os.getenv('FINBERT_QUANTIZE', '1') == '1':
+                quantized_path = self._get_quantized_model(onnx_dir)
+                if quantized_path:
+                    self.session = ort.InferenceSession(
+                        quantized_path, sess_options, providers=['CPUExecutionProvider']
+                    )
+                    logger.info("Using INT8 quantized FinBERT")
+            return True
+            
+        except Exception as e:
+            logger.warning(f"ONNX FinBERT unavailable, falling back to transformers pipeline: {e}")
+            self.session = None
+            return False
+    
+    def _get_quantized_model(self, onnx_dir: str):
+        """Return the path of a validated INT8 dynamic-quantized model, or None"""
+        quantized_path = os.path.join(onnx_dir, 'model_quantized.onnx')
+        rejected_marker = os.path.join(onnx_dir, 'model_quantized.rejected')
+        
+        if os.path.exists(rejected_marker):
+            return None
+        if os.path.exists(quantized_path):
+            return quantized_path
+        
+        try:
+            import onnxruntime as ort
+            from optimum.onnxruntime import ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+            
+            logger.info("Quantizing FinBERT to INT8 (first startup only)")
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            ORTQuantizer.from_pretrained(onnx_dir).quantize(save_dir=onnx_dir, quantization_config=qconfig)
+            
+            # Only keep the quantized model if it labels the check set like FP32
+            quantized_session = ort.InferenceSession(quantized_path, providers=['CPUExecutionProvider'])
+            reference = self._run_onnx(_QUANTIZATION_CHECK_TEXTS)
+            candidate = self._run_onnx(_QUANTIZATION_CHECK_TEXTS, session=quantized_session)
+            agreement = sum(
+                ref[0] == cand[0] for ref, cand in zip(reference, candidate)
+            ) / len(reference)
+            
+            if agreement < _QUANTIZATION_MIN_AGREEMENT:
+                logger.warning(f"Quantized FinBERT agreement too low ({agreement:.0%}), keeping FP32")
+                os.remove(quantized_path)
+                open(rejected_marker, 'w').close()
+                return None
+            
+            return quantized_path
+            
+        except Exception as e:
+            logger.warning(f"FinBERT quantization failed, keeping FP32: {e}")
+            return None
+    
+    def _run_onnx(self, texts: List[str], session=None) -> List[Tuple[str, float]]:
+        """Run the ONNX session over texts and return (label, score) per text"""
+        encoded = self.tokenizer(
+            texts, truncation=True, max_length=512, padding=True, return_tensors='np'
+        )
+        return self._predict_encoded(encoded, session or self.session)
+    
+    def _run_onnx_bucketed(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """Run the ONNX session with texts grouped into fixed token-length buckets.
+        
+        Short headlines are no longer padded to the longest article in the batch,
+        and each bucket always has the same shape for ONNX Runtime.
+        """
+        encoded = self.tokenizer(texts, truncation=True, max_length=512)
+        
+        buckets: Dict[int, List[int]] = {}
+        for i, ids in enumerate(encoded['input_ids']):
+            size = next(b for b in _LENGTH_BUCKETS if len(ids) <= b)
+            buckets.setdefault(size, []).append(i)
+        
+        results: List[Tuple[str, float]] = [None] * len(texts)
+        for size, indices in buckets.items():
+            features = [{key: encoded[key][i] for key in encoded.keys()} for i in indices]
+            padded = self.tokenizer.pad(
+                features, padding='max_length', max_length=size, return_tensors='np'
+            )
+            for i, result in zip(indices, self._predict_encoded(padded, self.session)):
+                results[i] = result
+        return results
+    
+    def _predict_encoded(self, encoded, session) -> List[Tuple[str, float]]:
+        """Run a session on tokenizer output and map logits to (label, probability)"""
+        input_names = {i.name for i in session.get_inputs()}
+        feeds = {
+            name: encoded[name].astype(np.int64)
+            for name in ('input_ids', 'attention_mask', 'token_type_ids')
+            if name in input_names and name in encoded
+        }
+        logits = session.run(None, feeds)[0]
+        
+        # Softmax over classes
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs = exp / exp.sum(axis=1, keepdims=True)
+        best = probs.argmax(axis=1)
+        return [
+            (self.id2label.get(int(idx), 'neutral'), float(probs[row, idx]))
+            for row, idx in enumerate(best)
+        ]
+    
+    def _has_finbert(self) -> bool:
+        return self.is_loaded and (self.session is not None or self.sentiment_pipeline is not None)
+    
+    def analyze_sentiment(self, text: str, url: Optional[str] = None) -> Dict[str, Any]:
+        """Analyze sentiment of a single text
+        
+        Pass the article url when known so the persisted FinBERT result is
+        reused even if the headline text changes slightly.
+        """
+        try:
+            # The same story often appears across several feeds
+            key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+            cached = self._get_cached_sentiment(key)
+            if cached is not None:
+                return {**cached, 'text': text}
+            
+            # Near-duplicate matching only pays off when it can skip a FinBERT run
+            fingerprint = None
+            if self._has_finbert():
+                fingerprint = _simhash(text)
+                cached = self._get_near_duplicate_sentiment(fingerprint)
+                if cached is not None:
+                    return {**cached, 'text': text}
+            
+            disk_key = hashlib.sha1((url or text).encode('utf-8')).digest()
+            result = self._get_disk_sentiment(disk_key, text)
+            if result is None:
+                if self._has_finbert():
+                    result = self._analyze_with_finbert(text)
+                else:
+                    result = self._analyze_with_keywords(text)
+                self._store_disk_sentiment(disk_key, result)
+            
+            self._store_cached_sentiment(key, fingerprint, result)
+            return result
                 
         except Exception as e:
             logger.error(f"Error in sentiment analysis: {e}")
             return self._get_neutral_sentiment()
     
+    def _open_disk_cache(self) -> Optional[sqlite3.Connection]:
+        """Open the persistent FinBERT result store, or None if it can't be used"""
+        try:
+            os.makedirs(os.path.dirname(SENTIMENT_CACHE_DB) or '.', exist_ok=True)
+            conn = sqlite3.connect(SENTIMENT_CACHE_DB, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS s("
+                "h BLOB PRIMARY KEY, score REAL, label TEXT, conf REAL, model TEXT)"
+            )
+            conn.commit()
+            return conn
+        except Exception as e:
+            logger.warning(f"Sentiment disk cache unavailable: {e}")
+            return None
+    
+    def _get_disk_sentiment(self, disk_key: bytes, text: str) -> Optional[Dict[str, Any]]:
+        if self._disk is None:
+            return None
+        try:
+            with self._disk_lock:
+                row = self._disk.execute(
+                    "SELECT score, label, conf, model FROM s WHERE h = ?", (disk_key,)
+                ).fetchone()
+        except Exception as e:
+            logger.warning(f"Sentiment disk cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        score, label, conf, model = row
+        return {
+            'text': text,
+            'sentiment_score': score,
+            'sentiment_label': label,
+            'confidence': conf,
+            'model': model
+        }
+    
+    def _store_disk_sentiment(self, disk_key: bytes, result: Dict[str, Any]):
+        # Only FinBERT output is worth persisting; keyword scoring is cheap
+        if self._disk is None or result.get('model') != 'finbert':
+            return
+        try:
+            with self._disk_lock:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO s(h, score, label, conf, model) VALUES (?, ?, ?, ?, ?)",
+                    (disk_key, result['sentiment_score'], result['sentiment_label'],
+                     result['confidence'], result['model'])
+                )
+                self._disk.commit()
+        except Exception as e:
+            logger.warning(f"Sentiment disk cache write failed: {e}")
+    
+    def _get_cached_sentiment(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up an exact match by text hash"""
+        with self._cache_lock:
+            cached = self._exact_cache.get(key)
+            if cached is not None:
+                self._exact_cache.move_to_end(key)
+            return cached
+    
+    def _get_near_duplicate_sentiment(self, fingerprint: int) -> Optional[Dict[str, Any]]:
+        """Look up a recent result whose SimHash is within _SIMHASH_MAX_DISTANCE bits"""
+        with self._cache_lock:
+            for other, result in self._recent_fingerprints:
+                if bin(fingerprint ^ other).count('1') <= _SIMHASH_MAX_DISTANCE:
+                    return result
+        return None
+    
+    def _store_cached_sentiment(self, key: str, fingerprint: Optional[int], result: Dict[str, Any]):
+        with self._cache_lock:
+            self._exact_cache[key] = result
+            if len(self._exact_cache) > _EXACT_CACHE_SIZE:
+                self._exact_cache.popitem(last=False)
+            if fingerprint is not None:
+                self._recent_fingerprints.append((fingerprint, result))
+    
     def analyze_batch_sentiment(self, texts: List[str]) -> List[Dict[str, Any]]:
         """Analyze sentiment of multiple texts"""
         try:
-            if self.is_loaded and self.sentiment_pipeline:
+            if self._has_finbert():
                 return self._analyze_batch_with_finbert(texts)
             else:
                 return [self._analyze_with_keywords(text) for text in texts]
@@ -67,16 +446,15 @@ class SentimentAnalyzer:
     def _analyze_with_finbert(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment using FinBERT model"""
         try:
-            # Truncate text if too long for model
-            max_length = 512
-            if len(text) > max_length:
-                text = text[:max_length]
-            
-            result = self.sentiment_pipeline(text)
+            # The tokenizer truncates to FinBERT's 512-token limit
+            if self.session is not None:
+                label, score = self._run_onnx([text])[0]
+            else:
+                result = self.sentiment_pipeline(text, truncation=True, max_length=512)
+                label = result[0]['label']
+                score = result[0]['score']
             
             # FinBERT returns: positive, negative, neutral
-            label = result[0]['label']
-            score = result[0]['score']
             
             # Convert to our format
             if label == 'positive':
@@ -104,16 +482,17 @@ class SentimentAnalyzer:
     def _analyze_batch_with_finbert(self, texts: List[str]) -> List[Dict[str, Any]]:
         """Analyze sentiment of multiple texts using FinBERT"""
         try:
-            # Truncate texts if too long
-            max_length = 512
-            truncated_texts = [text[:max_length] if len(text) > max_length else text for text in texts]
-            
-            results = self.sentiment_pipeline(truncated_texts)
+            # The tokenizer truncates to FinBERT's 512-token limit
+            if self.session is not None:
+                results = self._run_onnx_bucketed(texts)
+            else:
+                results = [
+                    (r['label'], r['score'])
+                    for r in self.sentiment_pipeline(texts, truncation=True, max_length=512)
+                ]
             
             analyzed_results = []
-            for i, result in enumerate(results):
-                label = result['label']
-                score = result['score']
+            for i, (label, score) in enumerate(results):
                 
                 if label == 'positive':
                     sentiment_score = score
@@ -142,32 +521,30 @@ class SentimentAnalyzer:
     def _analyze_with_keywords(self, text: str) -> Dict[str, Any]:
         """Fallback keyword-based sentiment analysis"""
         try:
-            # Financial-specific positive keywords
-            positive_keywords = [
-                'surge', 'jump', 'rise', 'gain', 'profit', 'earnings', 'growth',
-                'positive', 'bullish', 'rally', 'breakout', 'strong', 'up', 'higher',
-                'beat', 'exceed', 'outperform', 'recovery', 'bounce', 'climb'
-            ]
-            
-            # Financial-specific negative keywords
-            negative_keywords = [
-                'fall', 'drop', 'decline', 'loss', 'crash', 'bearish', 'weak',
-                'negative', 'down', 'plunge', 'slump', 'concern', 'risk', 'lower',
-                'miss', 'disappoint', 'underperform', 'selloff', 'correction'
-            ]
-            
-            # Financial-specific neutral keywords
-            neutral_keywords = [
-                'stable', 'steady', 'maintain', 'hold', 'unchanged', 'flat',
-                'consolidate', 'range', 'support', 'resistance', 'technical'
-            ]
-            
             text_lower = text.lower()
             
-            # Count keyword occurrences
-            positive_count = sum(1 for word in positive_keywords if word in text_lower)
-            negative_count = sum(1 for word in negative_keywords if word in text_lower)
-            neutral_count = sum(1 for word in neutral_keywords if word in text_lower)
+            # Count keyword occurrences (each distinct keyword counts once)
+            if self._keyword_automaton is not None:
+                # Keep only hits that are whole words, e.g. not 'up' inside 'support'
+                last = len(text_lower) - 1
+                found = {
+                    value for end, value in self._keyword_automaton.iter(text_lower)
+                    if (end == last or text_lower[end + 1] not in _WORD_CHARS)
+                    and (end < len(value[1]) or text_lower[end - len(value[1])] not in _WORD_CHARS)
+                }
+                counts = Counter(category for category, _ in found)
+                positive_count = counts['positive']
+                negative_count = counts['negative']
+                neutral_count = counts['neutral']
+            else:
+                # Single pass over the words
+                counts = [0, 0, 0]
+                get_category = _KEYWORD_CATEGORIES.get
+                for word in set(_WORD_RE.findall(text_lower)):
+                    category = get_category(word)
+                    if category is not None:
+                        counts[category] += 1
+                positive_count, negative_count, neutral_count = counts
             
             # Calculate sentiment score
             if positive_count > negative_count:
@@ -222,13 +599,18 @@ class SentimentAnalyzer:
             # Analyze all texts
             results = self.analyze_batch_sentiment(texts)
             
-            # Calculate summary statistics
-            total_score = sum(result['sentiment_score'] for result in results)
-            avg_score = total_score / len(results)
+            # Calculate summary statistics over flat arrays
+            count = len(results)
+            scores = np.fromiter((r['sentiment_score'] for r in results), dtype=np.float64, count=count)
+            confidences = np.fromiter((r['confidence'] for r in results), dtype=np.float64, count=count)
+            labels = np.fromiter(
+                (_LABEL_IDS.get(r['sentiment_label'], 3) for r in results), dtype=np.int8, count=count
+            )
             
-            positive_count = sum(1 for r in results if r['sentiment_label'] == 'positive')
-            negative_count = sum(1 for r in results if r['sentiment_label'] == 'negative')
-            neutral_count = sum(1 for r in results if r['sentiment_label'] == 'neutral')
+            avg_score = float(scores.mean())
+            positive_count, negative_count, neutral_count = (
+                int(c) for c in np.bincount(labels, minlength=4)[:3]
+            )
             
             # Determine overall sentiment
             if avg_score > 0.2:
@@ -239,8 +621,7 @@ class SentimentAnalyzer:
                 overall_sentiment = 'neutral'
             
             # Calculate confidence based on consistency
-            total_confidence = sum(result['confidence'] for result in results)
-            avg_confidence = total_confidence / len(results)
+            avg_confidence = float(confidences.mean())
             
             return {
                 'overall_sentiment': overall_sentiment,
@@ -267,3 +648,8 @@ class SentimentAnalyzer:
     def is_model_available(self) -> bool:
         """Check if the ML model is available"""
         return self.is_loaded
+
+@lru_cache(maxsize=1)
+def get_sentiment_analyzer() -> SentimentAnalyzer:
+    """Return the process-wide SentimentAnalyzer so the model is loaded only once"""
+    return SentimentAnalyzer()
@@ -6,6 +6,10 @@ from datetime import datetime
 
 class StockRecommendation(db.Model):
     __tablename__ = 'stock_recommendations'
+    __table_args__ = (
+        # Serves the "latest N for a symbol" lookup without a sort
+        db.Index('ix_stock_recommendations_symbol_created_at', 'symbol', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     symbol = db.Column(db.String(20), nullable=False)
@@ -16,7 +20,7 @@ class StockRecommendation(db.Model):
     current_price = db.Column(db.Float, nullable=True)
     target_price = db.Column(db.Float, nullable=True)
     reasoning = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     def __repr__(self):
         return f'<StockRecommendation {self.symbol}: {self.recommendation}>'
@@ -32,5 +36,6 @@ class StockRecommendation(db.Model):
             'current_price': self.current_price,
             'target_price': self.target_price,
             'reasoning': self.reasoning,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            # Left as a datetime; the API's orjson encoder writes it as ISO 8601
+            'created_at': self.created_at
         }
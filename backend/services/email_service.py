@@ -5,6 +5,8 @@ from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 import os
 from typing import List, Dict, Any
+from jinja2 import DictLoader, Environment
+from sqlalchemy import update
 try:
     from backend.models import User, StockRecommendation
 except Exception:
@@ -17,6 +19,113 @@ except Exception:
 
 logger = logging.getLogger(__name__)
 
+_EMAIL_STYLE = """
+                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+                .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+                .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }
+                .content { background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }"""
+
+CONFIRMATION_TEMPLATE = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Welcome to Stock Recommendations</title>
+            <style>""" + _EMAIL_STYLE + """
+                .button { display: inline-block; padding: 12px 24px; background: #667eea; color: white; text-decoration: none; border-radius: 5px; margin: 20px 0; }
+                .footer { text-align: center; margin-top: 30px; color: #666; font-size: 14px; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>🎉 Welcome to Stock Recommendations!</h1>
+                    <p>Your daily dose of intelligent stock insights</p>
+                </div>
+                <div class="content">
+                    <h2>Hello!</h2>
+                    <p>Thank you for subscribing to our stock recommendation service. You're now part of a community that receives:</p>
+                    <ul>
+                        <li>📈 Daily stock recommendations based on our proprietary algorithm</li>
+                        <li>📊 Technical analysis and market sentiment insights</li>
+                        <li>🤖 Machine learning-powered price predictions</li>
+                        <li>📰 Latest market news and analysis</li>
+                    </ul>
+                    <p>You'll receive your first recommendations tomorrow morning. Stay tuned!</p>
+                    <a href="#" class="button">Visit Our Website</a>
+                    <p><strong>Note:</strong> You can unsubscribe at any time by replying to this email with "UNSUBSCRIBE".</p>
+                </div>
+                <div class="footer">
+                    <p>© 2024 Stock Recommendation System. All rights reserved.</p>
+                    <p>This email was sent to {{ email }}</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+
+RECOMMENDATION_TEMPLATE = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Stock Recommendations - {{ title }}</title>
+            <style>""" + _EMAIL_STYLE + """
+                .footer { text-align: center; margin-top: 30px; color: #666; font-size: 14px; }
+                .disclaimer { background: #fff3cd; border: 1px solid #ffeaa7; padding: 15px; border-radius: 5px; margin: 20px 0; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>📊 Stock Recommendations</h1>
+                    <p>{{ title }} - {{ now.strftime('%B %d, %Y') }}</p>
+                </div>
+                <div class="content">
+                    <h2>Today's Top Recommendations</h2>
+                    {% for rec in recs %}
+            <div style="border: 1px solid #ddd; border-radius: 8px; padding: 20px; margin: 15px 0; background: white;">
+                <h3 style="margin: 0 0 10px 0; color: {{ ACTION_COLORS.get(rec.get('recommendation', 'HOLD'), '#6c757d') }};">
+                    {{ rec.get('symbol', 'N/A') }} - {{ rec.get('recommendation', 'HOLD') }}
+                </h3>
+                <p><strong>Current Price:</strong> ₹{{ '{:,.2f}'.format(rec.get('current_price', 'N/A')) }}</p>
+                <p><strong>Target Price:</strong> ₹{{ '{:,.2f}'.format(rec.get('target_price', 'N/A')) }}</p>
+                <p><strong>Confidence:</strong> {{ '%.1f' % (rec.get('confidence_score', 0) * 100) }}%</p>
+                <p><strong>Reasoning:</strong> {{ rec.get('reasoning', 'N/A') }}</p>
+            </div>
+                    {% endfor %}
+                    
+                    <div class="disclaimer">
+                        <h4>⚠️ Important Disclaimer</h4>
+                        <p>These recommendations are for informational purposes only and should not be considered as financial advice. Always do your own research and consult with a financial advisor before making investment decisions.</p>
+                    </div>
+                    
+                    <p><strong>Happy Investing!</strong></p>
+                </div>
+                <div class="footer">
+                    <p>© 2024 Stock Recommendation System. All rights reserved.</p>
+                    <p>To unsubscribe, reply to this email with "UNSUBSCRIBE".</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+
+# Templates are compiled once per process; render() only fills in the values
+_template_env = Environment(
+    loader=DictLoader({'confirmation': CONFIRMATION_TEMPLATE, 'recommendation': RECOMMENDATION_TEMPLATE}),
+    autoescape=True
+)
+_template_env.globals['ACTION_COLORS'] = {
+    'BUY': '#28a745',
+    'SELL': '#dc3545',
+    'HOLD': '#ffc107'
+}
+_CONFIRMATION_TEMPLATE = _template_env.get_template('confirmation')
+_RECOMMENDATION_TEMPLATE = _template_env.get_template('recommendation')
+
 class EmailService:
     def __init__(self):
         self.smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
@@ -64,17 +173,26 @@ class EmailService:
                 logger.info("No recommendations found to send")
                 return True
             
-            # Send emails to all subscribers
-            success_count = 0
-            for user in active_users:
-                try:
-                    if self._send_recommendation_email(user.email, recommendations):
-                        success_count += 1
-                        # Update last email sent timestamp
-                        user.last_email_sent = datetime.utcnow()
-                        db.session.commit()
-                except Exception as e:
-                    logger.error(f"Failed to send email to {user.email}: {e}")
+            # The body is identical for every subscriber, so serialize and render it once
+            rec_dicts = [rec.to_dict() for rec in recommendations]
+            html_content = self._get_recommendation_email_template("Daily Update", rec_dicts)
+            
+            # Send emails to all subscribers over one SMTP connection
+            subject = f"Daily Stock Recommendations - {datetime.now().strftime('%Y-%m-%d')}"
+            messages = (
+                (user.email, self._build_message(user.email, subject, html_content))
+                for user in active_users
+            )
+            sent = set(self._send_batch(messages))
+            success_count = len(sent)
+            
+            # Update last email sent timestamps with one UPDATE statement
+            sent_ids = [user.id for user in active_users if user.email in sent]
+            if sent_ids:
+                db.session.execute(
+                    update(User).where(User.id.in_(sent_ids)).values(last_email_sent=datetime.utcnow())
+                )
+                db.session.commit()
             
             logger.info(f"Sent daily recommendations to {success_count}/{len(active_users)} subscribers")
             return success_count > 0
@@ -99,13 +217,15 @@ class EmailService:
             
             html_content = self._get_recommendation_email_template(symbol, [recommendation])
             
-            success_count = 0
-            for user in active_users:
-                try:
-                    if self._send_email(user.email, subject, html_content):
-                        success_count += 1
-                except Exception as e:
-                    logger.error(f"Failed to send alert to {user.email}: {e}")
+            # Build the MIME message once and only swap the recipient per send
+            msg = self._build_message(active_users[0].email, subject, html_content)
+            
+            def messages():
+                for user in active_users:
+                    msg.replace_header('To', user.email)
+                    yield user.email, msg
+            
+            success_count = len(self._send_batch(messages()))
             
             logger.info(f"Sent {symbol} alert to {success_count}/{len(active_users)} subscribers")
             return success_count > 0
@@ -114,36 +234,13 @@ class EmailService:
             logger.error(f"Error sending recommendation update: {e}")
             return False
     
-    def _send_recommendation_email(self, email: str, recommendations: List[StockRecommendation]) -> bool:
-        """Send recommendation email to a specific user"""
-        try:
-            subject = f"Daily Stock Recommendations - {datetime.now().strftime('%Y-%m-%d')}"
-            
-            html_content = self._get_recommendation_email_template("Daily Update", recommendations)
-            
-            return self._send_email(email, subject, html_content)
-            
-        except Exception as e:
-            logger.error(f"Error sending recommendation email: {e}")
-            return False
-    
     def _send_email(self, to_email: str, subject: str, html_content: str) -> bool:
         """Send email using SMTP"""
         try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{self.from_name} <{self.email_address}>"
-            msg['To'] = to_email
-            
-            # Attach HTML content
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
+            msg = self._build_message(to_email, subject, html_content)
             
             # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.email_address, self.email_password)
+            with self._connect() as server:
                 server.send_message(msg)
             
             logger.info(f"Email sent successfully to {to_email}")
@@ -153,6 +250,51 @@ class EmailService:
             logger.error(f"Failed to send email to {to_email}: {e}")
             return False
     
+    def _send_batch(self, messages) -> List[str]:
+        """Send (to_email, message) pairs over one SMTP connection, returning the delivered addresses"""
+        sent = []
+        server = self._connect()
+        try:
+            for to_email, msg in messages:
+                try:
+                    try:
+                        server.send_message(msg)
+                    except smtplib.SMTPServerDisconnected:
+                        logger.warning("SMTP connection dropped, reconnecting")
+                        server = self._connect()
+                        server.send_message(msg)
+                    sent.append(to_email)
+                except Exception as e:
+                    logger.error(f"Failed to send email to {to_email}: {e}")
+        finally:
+            try:
+                server.quit()
+            except Exception:
+                pass
+        return sent
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open an authenticated SMTP connection"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        try:
+            server.starttls()
+            server.login(self.email_address, self.email_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def _build_message(self, to_email: str, subject: str, html_content: str) -> MIMEMultipart:
+        """Create the MIME message for an HTML email"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = f"{self.from_name} <{self.email_address}>"
+        msg['To'] = to_email
+        
+        # Attach HTML content
+        msg.attach(MIMEText(html_content, 'html'))
+        return msg
+    
     def _check_email_config(self) -> bool:
         """Check if email configuration is properly set up"""
         return all([
@@ -164,111 +306,9 @@ class EmailService:
     
     def _get_confirmation_email_template(self, email: str) -> str:
         """Generate confirmation email HTML template"""
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Welcome to Stock Recommendations</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
-                .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }}
-                .button {{ display: inline-block; padding: 12px 24px; background: #667eea; color: white; text-decoration: none; border-radius: 5px; margin: 20px 0; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🎉 Welcome to Stock Recommendations!</h1>
-                    <p>Your daily dose of intelligent stock insights</p>
-                </div>
-                <div class="content">
-                    <h2>Hello!</h2>
-                    <p>Thank you for subscribing to our stock recommendation service. You're now part of a community that receives:</p>
-                    <ul>
-                        <li>📈 Daily stock recommendations based on our proprietary algorithm</li>
-                        <li>📊 Technical analysis and market sentiment insights</li>
-                        <li>🤖 Machine learning-powered price predictions</li>
-                        <li>📰 Latest market news and analysis</li>
-                    </ul>
-                    <p>You'll receive your first recommendations tomorrow morning. Stay tuned!</p>
-                    <a href="#" class="button">Visit Our Website</a>
-                    <p><strong>Note:</strong> You can unsubscribe at any time by replying to this email with "UNSUBSCRIBE".</p>
-                </div>
-                <div class="footer">
-                    <p>© 2024 Stock Recommendation System. All rights reserved.</p>
-                    <p>This email was sent to {email}</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        return _CONFIRMATION_TEMPLATE.render(email=email)
     
     def _get_recommendation_email_template(self, title: str, recommendations: List[StockRecommendation]) -> str:
         """Generate recommendation email HTML template"""
-        recommendations_html = ""
-        for rec in recommendations:
-            rec_dict = rec.to_dict() if hasattr(rec, 'to_dict') else rec
-            action_color = {
-                'BUY': '#28a745',
-                'SELL': '#dc3545',
-                'HOLD': '#ffc107'
-            }.get(rec_dict.get('recommendation', 'HOLD'), '#6c757d')
-            
-            recommendations_html += f"""
-            <div style="border: 1px solid #ddd; border-radius: 8px; padding: 20px; margin: 15px 0; background: white;">
-                <h3 style="margin: 0 0 10px 0; color: {action_color};">
-                    {rec_dict.get('symbol', 'N/A')} - {rec_dict.get('recommendation', 'HOLD')}
-                </h3>
-                <p><strong>Current Price:</strong> ₹{rec_dict.get('current_price', 'N/A'):,.2f}</p>
-                <p><strong>Target Price:</strong> ₹{rec_dict.get('target_price', 'N/A'):,.2f}</p>
-                <p><strong>Confidence:</strong> {rec_dict.get('confidence_score', 0)*100:.1f}%</p>
-                <p><strong>Reasoning:</strong> {rec_dict.get('reasoning', 'N/A')}</p>
-            </div>
-            """
-        
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Stock Recommendations - {title}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
-                .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
-                .disclaimer {{ background: #fff3cd; border: 1px solid #ffeaa7; padding: 15px; border-radius: 5px; margin: 20px 0; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>📊 Stock Recommendations</h1>
-                    <p>{title} - {datetime.now().strftime('%B %d, %Y')}</p>
-                </div>
-                <div class="content">
-                    <h2>Today's Top Recommendations</h2>
-                    {recommendations_html}
-                    
-                    <div class="disclaimer">
-                        <h4>⚠️ Important Disclaimer</h4>
-                        <p>These recommendations are for informational purposes only and should not be considered as financial advice. Always do your own research and consult with a financial advisor before making investment decisions.</p>
-                    </div>
-                    
-                    <p><strong>Happy Investing!</strong></p>
-                </div>
-                <div class="footer">
-                    <p>© 2024 Stock Recommendation System. All rights reserved.</p>
-                    <p>To unsubscribe, reply to this email with "UNSUBSCRIBE".</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        recs = [rec.to_dict() if hasattr(rec, 'to_dict') else rec for rec in recommendations]
+        return _RECOMMENDATION_TEMPLATE.render(title=title, recs=recs, now=datetime.now())
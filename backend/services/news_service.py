@@ -1,8 +1,123 @@
 import feedparser
 import requests
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+import re
+import threading
 import time
 import random
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from collections import defaultdict
+from heapq import nlargest
+from operator import attrgetter
+from requests.adapters import HTTPAdapter
+try:
+    import feedparser_rs
+except ImportError:  # optional Rust parser; feedparser handles everything without it
+    feedparser_rs = None
+try:
+    from xxhash import xxh3_64_hexdigest as _digest64
+except ImportError:  # optional; blake2b gives an equally stable (slower) digest
+    import hashlib
+    
+    def _digest64(data):
+        return hashlib.blake2b(data, digest_size=8).hexdigest()
+try:
+    from Levenshtein import ratio as _title_similarity
+except ImportError:  # optional C extension; difflib gives a close pure-Python score
+    from difflib import SequenceMatcher
+    
+    def _title_similarity(a, b):
+        return SequenceMatcher(None, a, b).ratio()
+try:
+    from ciso8601 import parse_datetime as _parse_iso_date
+except ImportError:  # optional C parser; fromisoformat handles the same Atom dates
+    def _parse_iso_date(date_string):
+        return datetime.fromisoformat(date_string.replace('Z', '+00:00'))
+from urllib3.util.retry import Retry
+
+# Seconds to wait for a feed before giving up on it
+FEED_TIMEOUT = 8
+
+# Shared HTTP session so feed polls reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+))
+_SESSION.headers.update({'User-Agent': feedparser.USER_AGENT})
+
+@dataclass(slots=True)
+class NewsItem:
+    """One news story; orjson serializes it to the same JSON object as a dict"""
+    id: str
+    title: str
+    link: str
+    summary: str
+    published: str
+    source: str
+    category: str
+    scraped_at: str
+    timestamp: float
+    is_current: bool = True
+
+# Characters of raw text _clean_text looks at before falling back to the whole string
+_CLEAN_TEXT_SCAN = 1024
+
+# Titles at least this similar (0-1) are treated as the same story
+NEAR_DUPLICATE_RATIO = 0.88
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+# Substring of the feed URL -> readable source name, checked in order
+_SOURCE_MAP = (
+    ('yahoo', 'Yahoo Finance'),
+    ('reuters', 'Reuters'),
+    ('ft.com', 'Financial Times'),
+    ('cnn.com', 'CNN Money'),
+    ('google.com', 'Google News')
+)
+
+def _entry_id(link):
+    """Stable id for a feed entry, identical across polls and processes"""
+    return 'rss_' + _digest64(link.encode('utf-8'))
+
+@lru_cache(maxsize=64)
+def _resolve_source_name(feed_url):
+    for key, name in _SOURCE_MAP:
+        if key in feed_url:
+            return name
+    return 'Financial News'
+
+# Evergreen headlines served when every feed fails
+_FALLBACK_TOPICS = (
+    "Global Stock Markets Show Mixed Performance in Today's Session",
+    "Technology Sector Leads Market Gains Amid Earnings Reports",
+    "Federal Reserve Interest Rate Decision Impacts Investor Sentiment",
+    "Cryptocurrency Markets Experience Volatility in Early Trading",
+    "Asian Markets Respond Positively to US Economic Data",
+    "European Stocks Open Higher on Positive Economic Outlook",
+    "Oil Prices Fluctuate Amid Global Supply Concerns",
+    "Banking Sector Shows Strength in Latest Financial Results",
+    "Retail Stocks React to Consumer Spending Data",
+    "Electric Vehicle Manufacturers Report Strong Quarterly Growth",
+    "Fintech Companies Drive Innovation in Financial Services",
+    "Sustainable Investing Gains Momentum Among Institutional Investors",
+    "Mergers and Acquisitions Activity Picks Up in Tech Sector",
+    "Central Bank Policies Continue to Influence Global Markets",
+    "Emerging Markets Show Resilience Amid Economic Uncertainty"
+)
+
+# Static fields of the fallback items, built once at import
+_FALLBACK_TEMPLATES = tuple({
+    'title': topic,
+    'link': '#',
+    'summary': f'Latest updates: {topic}',
+    'source': 'Market Update',
+    'category': 'markets'
+} for topic in _FALLBACK_TOPICS)
 
 class NewsService:
     def __init__(self):
@@ -20,36 +135,65 @@ class NewsService:
             'https://news.google.com/rss/search?q=business+finance+stocks+when:1d&hl=en-US&gl=US&ceid=US:en'
         ]
         
+        # Merged/processed result, rebuilt from the per-feed cache after merge_ttl
         self.cache = {}
         self.cache_time = None
-        self.cache_duration = 1800  # 30 minutes cache
+        self.merge_ttl = 60
+        # Items kept in the merged cache whatever limit triggered the refresh;
+        # covers get_news_for_symbol's 50, callers slice to their own limit
+        self.cache_size = 50
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        
+        # Per-feed entries and conditional GET state:
+        # url -> (etag, modified, entries, fetched_at); fetched_at is time.monotonic()
+        self._feed_cache = {}
+        self.cache_duration = 1800  # 30 minutes per feed
     
     def get_latest_news(self, limit=15, force=False):
         """Get fresh news from reliable sources"""
-        current_time = time.time()
-        
-        # Return cached news if still valid
-        if (not force and self.cache_time and 
-            current_time - self.cache_time < self.cache_duration and 
-            'news' in self.cache):
+        # Serve cached news immediately; once it is older than merge_ttl,
+        # rebuild it in the background instead of blocking this request
+        if not force and 'news' in self.cache:
+            if time.monotonic() - self.cache_time >= self.merge_ttl:
+                self._refresh_in_background()
             print("Returning cached news")
             return self.cache['news'][:limit]
         
+        return self._refresh_news(limit, force)
+    
+    def _refresh_in_background(self):
+        """Start one background refresh unless one is already running"""
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        
+        def run():
+            try:
+                self._refresh_news(self.cache_size)
+            except Exception as e:
+                print(f"Background news refresh failed: {e}")
+            finally:
+                self._refreshing = False
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def _refresh_news(self, limit, force=False):
+        """Fetch all feeds, then process and cache the merged news"""
+        current_time = time.monotonic()
+        
         print("Fetching fresh news...")
         all_news = []
         
-        # Try each reliable feed
-        for i, feed_url in enumerate(self.reliable_feeds):
-            try:
-                print(f"Trying feed {i+1}: {self._get_source_name(feed_url)}")
-                feed_news = self._fetch_feed_with_fallback(feed_url, 6)
+        # Fetch all reliable feeds concurrently; each feed is a different host.
+        # map() keeps results in feed order so dedup/sorting stay deterministic.
+        with ThreadPoolExecutor(max_workers=len(self.reliable_feeds)) as executor:
+            results = executor.map(lambda url: self._fetch_feed_with_fallback(url, 6, force), self.reliable_feeds)
+            for feed_url, feed_news in zip(self.reliable_feeds, results):
                 if feed_news:
                     all_news.extend(feed_news)
                     print(f"Got {len(feed_news)} news from {self._get_source_name(feed_url)}")
-                time.sleep(1)  # Be nice to servers
-            except Exception as e:
-                print(f"Error from {feed_url}: {e}")
-                continue
         
         # If no news from feeds, use fallback
         if not all_news:
@@ -57,41 +201,45 @@ class NewsService:
             all_news = self._get_fallback_with_current_news()
         
         # Process and cache
-        processed_news = self._process_news(all_news, limit)
+        processed_news = self._process_news(all_news, max(limit, self.cache_size))
         self.cache['news'] = processed_news
         self.cache_time = current_time
         
         print(f"Total news processed: {len(processed_news)}")
         return processed_news[:limit]
     
-    def _fetch_feed_with_fallback(self, feed_url, limit=6):
+    def _fetch_feed_with_fallback(self, feed_url, limit=6, force=False):
         """Fetch feed with multiple fallback strategies"""
         try:
-            # Try direct feed
-            feed = feedparser.parse(feed_url)
+            # Try direct feed (conditional GET, reusing entries when unchanged)
+            entries = self._get_feed_entries(feed_url, force)
             
             # If feed has no entries, try alternative URLs
-            if not feed.entries:
+            if not entries:
                 return self._try_alternative_feeds(feed_url, limit)
             
             news_items = []
-            for entry in feed.entries[:limit]:
-                # Force current timestamp for all news
-                current_time = datetime.now()
+            source = self._get_source_name(feed_url)
+            # Force current timestamp for all news; formatted once for the whole batch
+            current_time = datetime.now()
+            published = current_time.strftime('%a, %d %b %Y %H:%M:%S GMT')
+            scraped_at = current_time.isoformat()
+            for entry in entries[:limit]:
                 published_date = self._parse_feed_date(entry.get('published', ''))
                 
-                news_item = {
-                    'id': f"{hash(entry.link)}_{int(time.time())}",
-                    'title': self._clean_text(entry.title),
-                    'link': entry.link,
-                    'summary': self._clean_text(entry.get('summary', entry.title)),
-                    'published': current_time.strftime('%a, %d %b %Y %H:%M:%S GMT'),
-                    'source': self._get_source_name(feed_url),
-                    'category': 'markets',
-                    'scraped_at': current_time.isoformat(),
-                    'timestamp': time.time(),
-                    'is_current': True
-                }
+                news_item = NewsItem(
+                    id=_entry_id(entry.link),
+                    title=self._clean_text(entry.title),
+                    link=entry.link,
+                    summary=self._clean_text(entry.get('summary', entry.title)),
+                    published=published,
+                    source=source,
+                    category='markets',
+                    scraped_at=scraped_at,
+                    # Parsed once here so _process_news sorts on a plain number
+                    timestamp=published_date.timestamp(),
+                    is_current=True
+                )
                 news_items.append(news_item)
             
             return news_items
@@ -100,6 +248,55 @@ class NewsService:
             print(f"Feed error {feed_url}: {e}")
             return []
     
+    def _get_feed_entries(self, feed_url, force=False):
+        """Return feed entries, sending ETag/Last-Modified so unchanged feeds reply 304"""
+        cached = self._feed_cache.get(feed_url)
+        if not force and cached and time.monotonic() - cached[3] < self.cache_duration:
+            return cached[2]
+        
+        headers = {}
+        if cached and cached[0]:
+            headers['If-None-Match'] = cached[0]
+        if cached and cached[1]:
+            headers['If-Modified-Since'] = cached[1]
+        
+        response = self._request_feed(feed_url, headers)
+        if response is not None and response.status_code == 304 and cached:
+            # Unchanged: reuse the parsed entries and keep validators the 304 omits
+            self._feed_cache[feed_url] = (
+                response.headers.get('ETag', cached[0]),
+                response.headers.get('Last-Modified', cached[1]),
+                cached[2], time.monotonic()
+            )
+            return cached[2]
+        
+        entries = self._parse_response(response)
+        if entries:
+            self._feed_cache[feed_url] = (
+                response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                entries, time.monotonic()
+            )
+        return entries
+    
+    def _request_feed(self, feed_url, headers=None):
+        """GET a feed over the shared session; None on network errors"""
+        try:
+            return _SESSION.get(feed_url, headers=headers, timeout=FEED_TIMEOUT)
+        except requests.RequestException as e:
+            print(f"Feed request failed {feed_url}: {e}")
+            return None
+    
+    def _parse_response(self, response):
+        """Parse a downloaded feed body into entries (empty on HTTP errors)"""
+        if response is None or not response.ok:
+            return []
+        if feedparser_rs is not None:
+            try:
+                return feedparser_rs.parse(response.content).entries
+            except Exception as e:
+                print(f"feedparser-rs failed, falling back to feedparser: {e}")
+        return feedparser.parse(response.content, response_headers=dict(response.headers)).entries
+    
     def _try_alternative_feeds(self, original_url, limit):
         """Try alternative feed URLs if primary fails"""
         alternatives = {
@@ -120,9 +317,9 @@ class NewsService:
             if key in original_url:
                 for alt_url in urls:
                     try:
-                        feed = feedparser.parse(alt_url)
-                        if feed.entries:
-                            return self._format_feed_entries(feed.entries[:limit], alt_url)
+                        entries = self._parse_response(self._request_feed(alt_url))
+                        if entries:
+                            return self._format_feed_entries(entries[:limit], alt_url)
                     except:
                         continue
         return []
@@ -131,34 +328,42 @@ class NewsService:
         """Format feed entries consistently"""
         news_items = []
         current_time = datetime.now()
+        published = current_time.strftime('%a, %d %b %Y %H:%M:%S GMT')
+        scraped_at = current_time.isoformat()
+        source = self._get_source_name(feed_url)
         
         for entry in entries:
-            news_item = {
-                'id': f"{hash(entry.link)}_{int(time.time())}",
-                'title': self._clean_text(entry.title),
-                'link': entry.link,
-                'summary': self._clean_text(entry.get('summary', 'Latest financial market news and updates.')),
-                'published': current_time.strftime('%a, %d %b %Y %H:%M:%S GMT'),
-                'source': self._get_source_name(feed_url),
-                'category': 'markets',
-                'scraped_at': current_time.isoformat(),
-                'timestamp': time.time(),
-                'is_current': True
-            }
+            published_date = self._parse_feed_date(entry.get('published', ''))
+            news_item = NewsItem(
+                id=_entry_id(entry.link),
+                title=self._clean_text(entry.title),
+                link=entry.link,
+                summary=self._clean_text(entry.get('summary', 'Latest financial market news and updates.')),
+                published=published,
+                source=source,
+                category='markets',
+                scraped_at=scraped_at,
+                timestamp=published_date.timestamp(),
+                is_current=True
+            )
             news_items.append(news_item)
         
         return news_items
     
     def _parse_feed_date(self, date_string):
-        """Parse feed date - but we'll use current time anyway"""
-        try:
-            for fmt in ['%a, %d %b %Y %H:%M:%S %z', '%Y-%m-%dT%H:%M:%S%z', '%a, %d %b %Y %H:%M:%S %Z']:
+        """Parse an RSS (RFC 822) or Atom (ISO 8601) date, defaulting to now"""
+        if date_string:
+            # ISO dates ("2024-01-31T...") go straight to the ISO parser rather
+            # than failing the RFC 822 parse first
+            if date_string[4:5] != '-':
                 try:
-                    return datetime.strptime(date_string, fmt)
-                except:
-                    continue
-        except:
-            pass
+                    return parsedate_to_datetime(date_string)
+                except (TypeError, ValueError):
+                    pass
+            try:
+                return _parse_iso_date(date_string)
+            except ValueError:
+                pass
         return datetime.now()
     
     def _clean_text(self, text):
@@ -166,8 +371,13 @@ class NewsService:
         if not text:
             return "Financial market news and updates"
         
-        # Remove extra whitespace and truncate
-        text = ' '.join(text.split())
+        # Remove extra whitespace and truncate. Only a prefix is needed for the
+        # 150-char result, so long summaries aren't split in full unless the
+        # prefix collapses to less than that.
+        cleaned = ' '.join(text[:_CLEAN_TEXT_SCAN].split())
+        if len(cleaned) <= 150 and len(text) > _CLEAN_TEXT_SCAN:
+            cleaned = ' '.join(text.split())
+        text = cleaned
         if len(text) > 150:
             text = text[:147] + "..."
         
@@ -175,78 +385,57 @@ class NewsService:
     
     def _get_source_name(self, feed_url):
         """Get readable source name"""
-        source_map = {
-            'yahoo': 'Yahoo Finance',
-            'reuters': 'Reuters',
-            'ft.com': 'Financial Times',
-            'cnn.com': 'CNN Money',
-            'google.com': 'Google News'
-        }
-        
-        for key, name in source_map.items():
-            if key in feed_url:
-                return name
-        
-        return 'Financial News'
+        return _resolve_source_name(feed_url)
     
     def _process_news(self, news_items, limit):
         """Remove duplicates and ensure freshness"""
-        # Remove exact duplicates
+        # Remove exact duplicates, keyed by a hash of the case-folded title
         unique_news = []
-        seen_titles = set()
+        seen = set()
+        # Normalized titles kept so far, bucketed by their first 4 characters
+        # so near-duplicate checks only compare likely matches
+        buckets = defaultdict(list)
         
         for item in news_items:
-            title_lower = item['title'].lower().strip()
-            if title_lower not in seen_titles:
-                seen_titles.add(title_lower)
-                unique_news.append(item)
+            fingerprint = hash(item.title.strip().casefold())
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            
+            normalized = ' '.join(_PUNCT_RE.sub('', item.title.casefold()).split())
+            kept = buckets[normalized[:4]]
+            if any(_title_similarity(normalized, other) > NEAR_DUPLICATE_RATIO for other in kept):
+                continue
+            kept.append(normalized)
+            unique_news.append(item)
         
-        # Sort by timestamp (newest first)
-        unique_news.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
+        # Keep the newest `limit` items without sorting the whole list
+        newest = nlargest(limit, unique_news, key=attrgetter('timestamp'))
         
         # Ensure all news has current timestamp
         current_time = time.time()
-        for item in unique_news:
-            item['timestamp'] = current_time
-            item['is_current'] = True
+        for item in newest:
+            item.timestamp = current_time
+            item.is_current = True
         
-        return unique_news[:limit]
+        return newest
     
     def _get_fallback_with_current_news(self):
         """Generate current financial news as fallback"""
         current_time = datetime.now()
         timestamp = time.time()
+        published = current_time.strftime('%a, %d %b %Y %H:%M:%S GMT')
+        scraped_at = current_time.isoformat()
+        id_suffix = int(timestamp)
         
-        current_topics = [
-            "Global Stock Markets Show Mixed Performance in Today's Session",
-            "Technology Sector Leads Market Gains Amid Earnings Reports",
-            "Federal Reserve Interest Rate Decision Impacts Investor Sentiment",
-            "Cryptocurrency Markets Experience Volatility in Early Trading",
-            "Asian Markets Respond Positively to US Economic Data",
-            "European Stocks Open Higher on Positive Economic Outlook",
-            "Oil Prices Fluctuate Amid Global Supply Concerns",
-            "Banking Sector Shows Strength in Latest Financial Results",
-            "Retail Stocks React to Consumer Spending Data",
-            "Electric Vehicle Manufacturers Report Strong Quarterly Growth",
-            "Fintech Companies Drive Innovation in Financial Services",
-            "Sustainable Investing Gains Momentum Among Institutional Investors",
-            "Mergers and Acquisitions Activity Picks Up in Tech Sector",
-            "Central Bank Policies Continue to Influence Global Markets",
-            "Emerging Markets Show Resilience Amid Economic Uncertainty"
-        ]
-        
-        return [{
-            'id': f"current_{i}_{int(timestamp)}",
-            'title': topic,
-            'link': '#',
-            'summary': f'Latest updates: {topic}',
-            'published': current_time.strftime('%a, %d %b %Y %H:%M:%S GMT'),
-            'source': 'Market Update',
-            'category': 'markets',
-            'scraped_at': current_time.isoformat(),
-            'timestamp': timestamp,
-            'is_current': True
-        } for i, topic in enumerate(current_topics)]
+        # Only the time fields change between calls
+        return [NewsItem(
+            id=f"current_{i}_{id_suffix}",
+            **template,
+            published=published,
+            scraped_at=scraped_at,
+            timestamp=timestamp
+        ) for i, template in enumerate(_FALLBACK_TEMPLATES)]
     
     # Keep existing method signatures
     def get_news(self, category='latest', limit=15):
@@ -265,10 +454,14 @@ class NewsService:
         try:
             symbol_upper = (symbol or '').upper()
             latest = self.get_latest_news(limit=50)
+            # Checking the title first skips uppercasing the longer summary on a match
             filtered = [
                 item for item in latest
-                if symbol_upper in (item.get('title', '') + ' ' + item.get('summary', '')).upper()
+                if symbol_upper in item.title.upper() or symbol_upper in item.summary.upper()
             ]
             return (filtered or latest)[:limit]
         except Exception:
             return self.get_latest_news(limit)
+
+# Shared instance so every caller reuses the same feed and merged-news caches
+news_service = NewsService()
@@ -1,6 +1,9 @@
 import logging
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import func, insert, select
 try:
     from backend.models import StockRecommendation
 except Exception:
@@ -12,223 +15,325 @@ except Exception:
     from app import db
 
 try:
-    from backend.services.stock_service import StockService
-    from backend.services.news_service import NewsService
+    from backend.services.stock_service import stock_service
+    from backend.services.news_service import NewsItem, news_service
 except Exception:
-    from services.stock_service import StockService
-    from services.news_service import NewsService
+    from services.stock_service import stock_service
+    from services.news_service import NewsItem, news_service
 
 try:
-    from backend.ml_models.sentiment_analyzer import SentimentAnalyzer
-    from backend.ml_models.price_predictor import PricePredictor
+    from backend.cache import cached_json, get_json, invalidate, set_json
 except Exception:
-    from ml_models.sentiment_analyzer import SentimentAnalyzer
-    from ml_models.price_predictor import PricePredictor
+    from cache import cached_json, get_json, invalidate, set_json
+
+try:
+    from backend.ml_models.sentiment_analyzer import get_sentiment_analyzer
+    from backend.ml_models.price_predictor import get_price_predictor
+except Exception:
+    from ml_models.sentiment_analyzer import get_sentiment_analyzer
+    from ml_models.price_predictor import get_price_predictor
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; run the same code as plain NumPy
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
 
 logger = logging.getLogger(__name__)
 
+# The quote, indicator, news and prediction lookups are independent I/O, so
+# they run side by side and a recommendation costs the slowest of them
+_fetch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='recommendation')
+
+# Repeat requests for a symbol within this window reuse the stored result
+RECOMMENDATION_CACHE_TTL = 60
+
+# Custom algorithm rules in evaluation order: score weight and the reason
+# reported when the rule fires. Bit i of an algorithm result's 'flags' marks
+# rule i, and the reasons are only turned into text for the final reasoning.
+_RULE_WEIGHTS = np.array([2, 1, -2, -1, 2, -2, 1, 2, -2, 1, -1, 1], dtype=np.int64)
+_RULE_REASONS = (
+    "Strong positive momentum",
+    "Positive momentum",
+    "Strong negative momentum",
+    "Negative momentum",
+    "Oversold condition (RSI < 30)",
+    "Overbought condition (RSI > 70)",
+    "Neutral RSI range",
+    "Price above both moving averages",
+    "Price below both moving averages",
+    "MACD above signal line",
+    "MACD below signal line",
+    "High trading volume",
+)
+
+@njit(cache=True)
+def _score_rules(current_price, change_percent, volume, rsi, sma_20, sma_50, macd, macd_signal):
+    """Return (scores, flags) arrays; each rule is evaluated as a mask over all symbols"""
+    above_averages = (sma_20 > sma_50) & (current_price > sma_20)
+    macd_above = macd > macd_signal
+    
+    # One mask per rule, in _RULE_WEIGHTS/_RULE_REASONS order
+    fired = (
+        # Price momentum analysis
+        change_percent > 2,
+        (change_percent > 0) & (change_percent <= 2),
+        change_percent < -2,
+        (change_percent < 0) & (change_percent >= -2),
+        # RSI analysis
+        rsi < 30,
+        rsi > 70,
+        (rsi >= 40) & (rsi <= 60),
+        # Moving average analysis
+        above_averages,
+        ~above_averages & (current_price < sma_20) & (current_price < sma_50),
+        # MACD analysis
+        macd_above,
+        ~macd_above,
+        # Volume analysis
+        volume > 1000000  # High volume threshold
+    )
+    
+    scores = np.zeros(current_price.shape[0], dtype=np.int64)
+    flags = np.zeros(current_price.shape[0], dtype=np.int64)
+    for rule in range(len(fired)):
+        mask = fired[rule].astype(np.int64)
+        scores += _RULE_WEIGHTS[rule] * mask
+        flags |= mask << rule
+    return scores, flags.astype(np.uint16)
+
+def _flag_reasons(flags: int) -> List[str]:
+    """Reason strings for the rules marked in a flags bitmask"""
+    return [reason for bit, reason in enumerate(_RULE_REASONS) if flags >> bit & 1]
+
+# Sentiment labels as np.bincount slots; anything unrecognised counts as neutral
+_SENTIMENT_CODES = {'negative': 0, 'neutral': 1, 'positive': 2}
+
 class RecommendationService:
     def __init__(self):
-        self.stock_service = StockService()
-        self.news_service = NewsService()
-        self.sentiment_analyzer = SentimentAnalyzer()
-        self.price_predictor = PricePredictor()
+        self.stock_service = stock_service
+        self.news_service = news_service
+        self.sentiment_analyzer = get_sentiment_analyzer()
+        self.price_predictor = get_price_predictor()
         
     def get_recommendation_for_symbol(self, symbol: str) -> Dict[str, Any]:
         """Generate comprehensive recommendation for a stock symbol"""
         try:
-            # Get stock data
-            stock_data = self.stock_service.get_stock_data(symbol)
-            technical_indicators = self.stock_service.calculate_technical_indicators(symbol)
-            
-            # Get news and sentiment
-            news = self.news_service.get_news_for_symbol(symbol, limit=10)
-            market_sentiment = self._calculate_market_sentiment(news)
-            
-            # Run custom algorithm
-            algorithm_rec = self._run_custom_algorithm(stock_data, technical_indicators)
-            
-            # Get ML price prediction
-            price_prediction = self.price_predictor.predict_price(symbol)
-            
-            # Combine algorithm with sentiment and ML
-            final_recommendation = self._combine_recommendations(
-                algorithm_rec, market_sentiment, price_prediction
-            )
-            
-            # Calculate confidence score
-            confidence_score = self._calculate_confidence_score(
-                algorithm_rec, market_sentiment, price_prediction
+            # Only cache misses run the pipeline and store a StockRecommendation row
+            return cached_json(
+                self._cache_key(symbol),
+                RECOMMENDATION_CACHE_TTL,
+                lambda: self._generate_recommendation(symbol),
+                default=float
             )
-            
-            # Store recommendation
-            recommendation = StockRecommendation(
-                symbol=symbol,
-                recommendation=final_recommendation['action'],
-                confidence_score=confidence_score,
-                algorithm_recommendation=algorithm_rec['action'],
-                sentiment_score=market_sentiment['score'],
-                current_price=stock_data.get('current_price', 0),
-                target_price=price_prediction.get('target_price', 0),
-                reasoning=final_recommendation['reasoning']
-            )
-            
-            try:
-                db.session.add(recommendation)
-                db.session.commit()
-            except Exception as e:
-                logger.warning(f"Failed to store recommendation: {e}")
-                db.session.rollback()
-            
-            return {
-                'symbol': symbol,
-                'recommendation': final_recommendation['action'],
-                'confidence_score': confidence_score,
-                'algorithm_recommendation': algorithm_rec['action'],
-                'sentiment_score': market_sentiment['score'],
-                'current_price': stock_data.get('current_price', 0),
-                'target_price': price_prediction.get('target_price', 0),
-                'reasoning': final_recommendation['reasoning'],
-                'technical_indicators': technical_indicators,
-                'news_sentiment': market_sentiment,
-                'price_prediction': price_prediction
-            }
-            
         except Exception as e:
             logger.error(f"Error generating recommendation for {symbol}: {e}")
             return self._get_default_recommendation(symbol)
     
+    def invalidate(self, symbol: str):
+        """Forget the cached recommendation for a symbol"""
+        invalidate(self._cache_key(symbol))
+    
+    @staticmethod
+    def _cache_key(symbol: str) -> str:
+        return f"rec:{symbol}"
+    
+    def recommend_many(self, symbols: List[str]) -> List[Dict[str, Any]]:
+        """Generate recommendations for several symbols, storing new rows in one INSERT"""
+        results = {symbol: get_json(self._cache_key(symbol)) for symbol in symbols}
+        misses = [symbol for symbol, result in results.items() if result is None]
+        
+        # Indicators for all misses come from one kernel call; the other inputs
+        # are fetched concurrently, then everything is scored in one pass
+        indicators = self.stock_service.calculate_technical_indicators_bulk(misses)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            fetched = [
+                (symbol, inputs)
+                for symbol, inputs in zip(misses, executor.map(
+                    self._try_fetch_inputs, misses, [indicators[symbol] for symbol in misses]
+                ))
+                if inputs is not None
+            ]
+        
+        rows = []
+        if fetched:
+            algorithm_recs = self._run_custom_algorithm_batch(
+                [inputs[0] for _, inputs in fetched],
+                [inputs[1] for _, inputs in fetched]
+            )
+            for (symbol, inputs), algorithm_rec in zip(fetched, algorithm_recs):
+                result = self._build_result(symbol, *inputs, algorithm_rec)
+                set_json(self._cache_key(symbol), RECOMMENDATION_CACHE_TTL, result, default=float)
+                rows.append(self._build_recommendation_row(result))
+                results[symbol] = result
+        
+        if rows:
+            self._store_recommendations(rows)
+        return [results[symbol] or self._get_default_recommendation(symbol) for symbol in symbols]
+    
+    def _generate_recommendation(self, symbol: str) -> Dict[str, Any]:
+        """Run the full recommendation pipeline and store the result"""
+        result = self._compute_recommendation(symbol)
+        self._store_recommendations([self._build_recommendation_row(result)])
+        return result
+    
+    def _compute_recommendation(self, symbol: str) -> Dict[str, Any]:
+        """Run the full recommendation pipeline"""
+        stock_data, technical_indicators, news, price_prediction = self._fetch_inputs(symbol)
+        
+        # Run custom algorithm
+        algorithm_rec = self._run_custom_algorithm(stock_data, technical_indicators)
+        
+        return self._build_result(symbol, stock_data, technical_indicators, news, price_prediction, algorithm_rec)
+    
+    def _fetch_inputs(self, symbol: str, technical_indicators: Optional[Dict[str, float]] = None
+                      ) -> Tuple[Dict[str, Any], Dict[str, float], List[NewsItem], Dict[str, Any]]:
+        """Fetch stock data, indicators, news and the ML prediction concurrently"""
+        stock_future = _fetch_executor.submit(self.stock_service.get_stock_data, symbol)
+        if technical_indicators is None:
+            indicators_future = _fetch_executor.submit(self.stock_service.calculate_technical_indicators, symbol)
+        news_future = _fetch_executor.submit(self.news_service.get_news_for_symbol, symbol, 10)
+        prediction_future = _fetch_executor.submit(self.price_predictor.predict_price, symbol)
+        
+        return (
+            stock_future.result(),
+            indicators_future.result() if technical_indicators is None else technical_indicators,
+            news_future.result(),
+            prediction_future.result()
+        )
+    
+    def _try_fetch_inputs(self, symbol: str, technical_indicators: Optional[Dict[str, float]] = None):
+        try:
+            return self._fetch_inputs(symbol, technical_indicators)
+        except Exception as e:
+            logger.error(f"Error generating recommendation for {symbol}: {e}")
+            return None
+    
+    def _build_result(self, symbol: str, stock_data: Dict[str, Any], technical_indicators: Dict[str, float],
+                      news: List[NewsItem], price_prediction: Dict[str, Any],
+                      algorithm_rec: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine the scored algorithm with news sentiment and the ML prediction"""
+        # Get news and sentiment
+        market_sentiment = self._calculate_market_sentiment(news)
+        
+        # Combine algorithm with sentiment and ML
+        final_recommendation = self._combine_recommendations(
+            algorithm_rec, market_sentiment, price_prediction
+        )
+        
+        # Calculate confidence score
+        confidence_score = self._calculate_confidence_score(
+            algorithm_rec, market_sentiment, price_prediction
+        )
+        
+        return {
+            'symbol': symbol,
+            'recommendation': final_recommendation['action'],
+            'confidence_score': confidence_score,
+            'algorithm_recommendation': algorithm_rec['action'],
+            'sentiment_score': market_sentiment['score'],
+            'current_price': stock_data.get('current_price', 0),
+            'target_price': price_prediction.get('target_price', 0),
+            'reasoning': final_recommendation['reasoning'],
+            'technical_indicators': technical_indicators,
+            'news_sentiment': market_sentiment,
+            'price_prediction': price_prediction
+        }
+    
+    @staticmethod
+    def _build_recommendation_row(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Column values of the StockRecommendation row for a pipeline result"""
+        return {
+            'symbol': result['symbol'],
+            'recommendation': result['recommendation'],
+            'confidence_score': result['confidence_score'],
+            'algorithm_recommendation': result['algorithm_recommendation'],
+            'sentiment_score': result['sentiment_score'],
+            'current_price': result['current_price'],
+            'target_price': result['target_price'],
+            'reasoning': result['reasoning']
+        }
+    
+    def _store_recommendations(self, rows: List[Dict[str, Any]]):
+        """Insert recommendation rows with a single executemany and commit"""
+        try:
+            db.session.execute(insert(StockRecommendation), rows)
+            db.session.commit()
+        except Exception as e:
+            logger.warning(f"Failed to store recommendations: {e}")
+            db.session.rollback()
+    
     def _run_custom_algorithm(self, stock_data: Dict[str, Any], technical_indicators: Dict[str, float]) -> Dict[str, Any]:
         """Run custom stock recommendation algorithm"""
-        try:
-            current_price = stock_data.get('current_price', 0)
-            change_percent = stock_data.get('change_percent', 0)
-            volume = stock_data.get('volume', 0)
-            
-            rsi = technical_indicators.get('rsi', 50)
-            sma_20 = technical_indicators.get('sma_20', 0)
-            sma_50 = technical_indicators.get('sma_50', 0)
-            macd = technical_indicators.get('macd', 0)
-            macd_signal = technical_indicators.get('macd_signal', 0)
-            
-            # Initialize scoring
-            score = 0
-            reasons = []
-            
-            # Price momentum analysis
-            if change_percent > 2:
-                score += 2
-                reasons.append("Strong positive momentum")
-            elif change_percent > 0:
-                score += 1
-                reasons.append("Positive momentum")
-            elif change_percent < -2:
-                score -= 2
-                reasons.append("Strong negative momentum")
-            elif change_percent < 0:
-                score -= 1
-                reasons.append("Negative momentum")
-            
-            # RSI analysis
-            if rsi < 30:
-                score += 2
-                reasons.append("Oversold condition (RSI < 30)")
-            elif rsi > 70:
-                score -= 2
-                reasons.append("Overbought condition (RSI > 70)")
-            elif 40 <= rsi <= 60:
-                score += 1
-                reasons.append("Neutral RSI range")
-            
-            # Moving average analysis
-            if sma_20 > sma_50 and current_price > sma_20:
-                score += 2
-                reasons.append("Price above both moving averages")
-            elif current_price < sma_20 and current_price < sma_50:
-                score -= 2
-                reasons.append("Price below both moving averages")
-            
-            # MACD analysis
-            if macd > macd_signal:
-                score += 1
-                reasons.append("MACD above signal line")
-            else:
-                score -= 1
-                reasons.append("MACD below signal line")
-            
-            # Volume analysis
-            if volume > 1000000:  # High volume threshold
-                score += 1
-                reasons.append("High trading volume")
-            
-            # Determine action based on score
-            if score >= 3:
-                action = "BUY"
-            elif score <= -3:
-                action = "SELL"
-            else:
-                action = "HOLD"
-            
-            return {
+        return self._run_custom_algorithm_batch([stock_data], [technical_indicators])[0]
+    
+    def _run_custom_algorithm_batch(self, stock_rows: List[Dict[str, Any]],
+                                    indicator_rows: List[Dict[str, float]]) -> List[Dict[str, Any]]:
+        """Score many symbols at once with the compiled rule kernel"""
+        columns = np.array([
+            (
+                stock_data.get('current_price', 0),
+                stock_data.get('change_percent', 0),
+                stock_data.get('volume', 0),
+                technical_indicators.get('rsi', 50),
+                technical_indicators.get('sma_20', 0),
+                technical_indicators.get('sma_50', 0),
+                technical_indicators.get('macd', 0),
+                technical_indicators.get('macd_signal', 0)
+            )
+            for stock_data, technical_indicators in zip(stock_rows, indicator_rows)
+        ], dtype=np.float64).reshape(-1, 8).T
+        scores, flags = _score_rules(*np.ascontiguousarray(columns))
+        
+        # Determine action based on score
+        actions = np.where(scores >= 3, 'BUY', np.where(scores <= -3, 'SELL', 'HOLD'))
+        
+        return [
+            {
                 'action': action,
                 'score': score,
-                'reasons': reasons
-            }
-            
-        except Exception as e:
-            logger.error(f"Error in custom algorithm: {e}")
-            return {
-                'action': 'HOLD',
-                'score': 0,
-                'reasons': ['Algorithm error - defaulting to HOLD']
+                'flags': rule_flags
             }
+            for action, score, rule_flags in zip(actions.tolist(), scores.tolist(), flags.tolist())
+        ]
     
-    def _calculate_market_sentiment(self, news: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_market_sentiment(self, news: List[NewsItem]) -> Dict[str, Any]:
         """Calculate overall market sentiment from news"""
-        try:
-            if not news:
-                return {'score': 0, 'label': 'neutral', 'count': 0}
-            
-            total_score = 0
-            positive_count = 0
-            negative_count = 0
-            neutral_count = 0
-            
-            for article in news:
-                sentiment_score = article.get('sentiment_score', 0)
-                sentiment_label = article.get('sentiment_label', 'neutral')
-                
-                total_score += sentiment_score
-                
-                if sentiment_label == 'positive':
-                    positive_count += 1
-                elif sentiment_label == 'negative':
-                    negative_count += 1
-                else:
-                    neutral_count += 1
-            
-            avg_score = total_score / len(news)
-            
-            # Determine overall label
-            if avg_score > 0.2:
-                overall_label = 'positive'
-            elif avg_score < -0.2:
-                overall_label = 'negative'
-            else:
-                overall_label = 'neutral'
-            
-            return {
-                'score': avg_score,
-                'label': overall_label,
-                'count': len(news),
-                'positive_count': positive_count,
-                'negative_count': negative_count,
-                'neutral_count': neutral_count
-            }
-            
-        except Exception as e:
-            logger.error(f"Error calculating market sentiment: {e}")
+        if not news:
             return {'score': 0, 'label': 'neutral', 'count': 0}
+        
+        count = len(news)
+        scores = np.fromiter(
+            (getattr(article, 'sentiment_score', 0) for article in news),
+            dtype=np.float64, count=count
+        )
+        labels = np.fromiter(
+            (_SENTIMENT_CODES.get(getattr(article, 'sentiment_label', 'neutral'), 1) for article in news),
+            dtype=np.int8, count=count
+        )
+        
+        # Label tallies and the mean score come from single array reductions
+        negative_count, neutral_count, positive_count = np.bincount(labels, minlength=3).tolist()
+        avg_score = float(scores.mean())
+        
+        # Determine overall label
+        if avg_score > 0.2:
+            overall_label = 'positive'
+        elif avg_score < -0.2:
+            overall_label = 'negative'
+        else:
+            overall_label = 'neutral'
+        
+        return {
+            'score': avg_score,
+            'label': overall_label,
+            'count': count,
+            'positive_count': positive_count,
+            'negative_count': negative_count,
+            'neutral_count': neutral_count
+        }
     
     def _combine_recommendations(self, algorithm_rec: Dict[str, Any], 
                                 market_sentiment: Dict[str, Any], 
@@ -240,7 +345,7 @@ class RecommendationService:
             sentiment_label = market_sentiment['label']
             
             # Base reasoning
-            reasoning = f"Algorithm: {algorithm_action} - {', '.join(algorithm_rec['reasons'])}"
+            reasoning = f"Algorithm: {algorithm_action} - {', '.join(_flag_reasons(algorithm_rec['flags']))}"
             
             # Adjust based on sentiment
             if algorithm_action == "BUY" and sentiment_label == "negative":
@@ -289,28 +394,23 @@ class RecommendationService:
                                    market_sentiment: Dict[str, Any], 
                                    price_prediction: Dict[str, Any]) -> float:
         """Calculate confidence score for the recommendation"""
-        try:
-            # Base confidence from algorithm score
-            algorithm_score = abs(algorithm_rec.get('score', 0))
-            base_confidence = min(algorithm_score / 5.0, 1.0) * 0.6  # Max 60% from algorithm
-            
-            # Sentiment confidence
-            sentiment_confidence = 0.2  # Base 20%
-            if market_sentiment['count'] > 0:
-                sentiment_confidence += 0.1  # Bonus for having news data
-            
-            # ML prediction confidence
-            ml_confidence = 0.0
-            if price_prediction.get('confidence', 0) > 0.5:
-                ml_confidence = price_prediction['confidence'] * 0.2  # Max 20% from ML
-            
-            total_confidence = base_confidence + sentiment_confidence + ml_confidence
-            
-            return min(total_confidence, 1.0)  # Cap at 100%
-            
-        except Exception as e:
-            logger.error(f"Error calculating confidence score: {e}")
-            return 0.5  # Default 50% confidence
+        # Base confidence from algorithm score
+        algorithm_score = abs(algorithm_rec.get('score', 0))
+        base_confidence = min(algorithm_score / 5.0, 1.0) * 0.6  # Max 60% from algorithm
+        
+        # Sentiment confidence
+        sentiment_confidence = 0.2  # Base 20%
+        if market_sentiment['count'] > 0:
+            sentiment_confidence += 0.1  # Bonus for having news data
+        
+        # ML prediction confidence
+        ml_confidence = 0.0
+        if price_prediction.get('confidence', 0) > 0.5:
+            ml_confidence = price_prediction['confidence'] * 0.2  # Max 20% from ML
+        
+        total_confidence = base_confidence + sentiment_confidence + ml_confidence
+        
+        return min(total_confidence, 1.0)  # Cap at 100%
     
     def get_latest_recommendations(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get latest stock recommendations from database"""
@@ -340,6 +440,34 @@ class RecommendationService:
             logger.error(f"Error fetching recommendations for {symbol}: {e}")
             return []
     
+    def get_recommendations_for_symbols(self, symbols: List[str], limit_per: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the latest recommendations for several symbols with a single query"""
+        grouped = {symbol.upper(): [] for symbol in symbols}
+        try:
+            # Rank each symbol's rows newest first, then keep the top limit_per of each
+            ranked = select(
+                StockRecommendation.id,
+                func.row_number().over(
+                    partition_by=StockRecommendation.symbol,
+                    order_by=StockRecommendation.created_at.desc()
+                ).label('rn')
+            ).where(StockRecommendation.symbol.in_(list(grouped))).subquery()
+            
+            recommendations = db.session.scalars(
+                select(StockRecommendation)
+                .join(ranked, StockRecommendation.id == ranked.c.id)
+                .where(ranked.c.rn <= limit_per)
+                .order_by(StockRecommendation.symbol, StockRecommendation.created_at.desc())
+            )
+            for rec in recommendations:
+                grouped[rec.symbol].append(rec.to_dict())
+            
+            return grouped
+            
+        except Exception as e:
+            logger.error(f"Error fetching recommendations for {', '.join(grouped)}: {e}")
+            return {symbol: [] for symbol in grouped}
+    
     def _get_default_recommendation(self, symbol: str) -> Dict[str, Any]:
         """Return default recommendation when algorithm fails"""
         return {
@@ -1,24 +1,209 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import yfinance as yf
-import pandas as pd
-from datetime import datetime, timedelta
+import numpy as np
+import orjson
+from datetime import date, datetime, timedelta
 import logging
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from backend.cache import cached_pickle, coalesce, get_json, set_json
+except Exception:
+    from cache import cached_pickle, coalesce, get_json, set_json
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; run the same code in plain Python
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
 
 logger = logging.getLogger(__name__)
 
+# Quotes move during the session, so repeat lookups only reuse them briefly
+QUOTE_CACHE_TTL = 60
+
+# Daily bars only change once per trading day, so a short TTL is plenty
+HISTORY_CACHE_TTL = 900
+
+# Calendar days of daily bars fetched per symbol (~60 trading days, enough for
+# the 50-day SMA). Quotes, indicators and predictions all slice this one window.
+HISTORY_DAYS = 90
+
+# After this many Upstox failures in a row, skip Upstox for the cooldown (seconds)
+# instead of waiting out a timeout per symbol. After the cooldown a single call
+# probes Upstox while the rest keep skipping it until the probe succeeds or fails
+UPSTOX_FAILURE_THRESHOLD = 5
+UPSTOX_COOLDOWN = 30
+
+# Shared HTTP session so upstream calls reuse keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+))
+# Upstox calls are not retried: a failure should cost one timeout and reach the
+# circuit breaker, with Yahoo as the fallback (the longest mounted prefix wins)
+_SESSION.mount('https://api.upstox.com/', HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=32,
+    max_retries=Retry(total=0)
+))
+
+# Yahoo's chart endpoint answers plain requests, but rejects the default requests User-Agent
+_YAHOO_CHART_URL = 'https://query1.finance.yahoo.com/v8/finance/chart/{symbol}'
+_YAHOO_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+# Daily bar columns kept from Yahoo's history
+_BAR_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+def _empty_bars() -> Dict[str, np.ndarray]:
+    bars = {'Date': np.empty(0, dtype='datetime64[ns]')}
+    for column in _BAR_COLUMNS:
+        bars[column] = np.empty(0, dtype=np.float64)
+    return bars
+
+@njit(cache=True)
+def _indicator_core(close: np.ndarray) -> Tuple[float, float, float, float, float]:
+    """Return (rsi, sma_20, sma_50, macd, macd_signal) for a closing-price array.
+
+    One pass keeps running window sums and EMA state. Matches the pandas
+    rolling(...).mean() and ewm(span=...).mean() results, including NaN when
+    there are not enough prices for a window.
+    """
+    n = close.shape[0]
+    if n == 0:
+        return np.nan, np.nan, np.nan, np.nan, np.nan
+    
+    # ewm(adjust=True) is a weighted mean: numerator and weight total both decay
+    decay_12 = 1 - 2 / 13
+    decay_26 = 1 - 2 / 27
+    decay_9 = 1 - 2 / 10
+    num_12 = den_12 = num_26 = den_26 = num_9 = den_9 = 0.0
+    gain = loss = sum_20 = sum_50 = 0.0
+    macd = signal = 0.0
+    prev = close[0]
+    
+    for i in range(n):
+        price = close[i]
+        delta = price - prev
+        prev = price
+        
+        # Only the last window of each rolling mean is needed
+        if i >= n - 14:
+            if delta > 0:
+                gain += delta
+            elif delta < 0:
+                loss -= delta
+        if i >= n - 20:
+            sum_20 += price
+        if i >= n - 50:
+            sum_50 += price
+        
+        num_12 = price + decay_12 * num_12
+        den_12 = 1 + decay_12 * den_12
+        num_26 = price + decay_26 * num_26
+        den_26 = 1 + decay_26 * den_26
+        macd = num_12 / den_12 - num_26 / den_26
+        
+        num_9 = macd + decay_9 * num_9
+        den_9 = 1 + decay_9 * den_9
+        signal = num_9 / den_9
+    
+    rsi = np.nan
+    if n >= 14:
+        if loss > 0:
+            rsi = 100 - 100 / (1 + gain / loss)
+        elif gain > 0:
+            rsi = 100.0
+    sma_20 = sum_20 / 20 if n >= 20 else np.nan
+    sma_50 = sum_50 / 50 if n >= 50 else np.nan
+    return rsi, sma_20, sma_50, macd, signal
+
+@njit(cache=True)
+def _indicator_bulk(closes: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Run _indicator_core over every symbol's slice of one concatenated close array.
+
+    Symbol i owns closes[offsets[i]:offsets[i + 1]]; row i of the result holds
+    its (rsi, sma_20, sma_50, macd, macd_signal).
+    """
+    count = offsets.shape[0] - 1
+    out = np.empty((count, 5))
+    for i in range(count):
+        out[i, 0], out[i, 1], out[i, 2], out[i, 3], out[i, 4] = _indicator_core(closes[offsets[i]:offsets[i + 1]])
+    return out
+
+def warm_up() -> None:
+    """Compile the indicator kernels before the first request needs them"""
+    close = np.linspace(1.0, 2.0, 50)
+    _indicator_core(close)
+    _indicator_bulk(close, np.array([0, 50], dtype=np.int64))
+
+# Result keys, in the order the indicator kernels return them
+_INDICATOR_KEYS = ('rsi', 'sma_20', 'sma_50', 'macd', 'macd_signal')
+
+# Quote returned when no upstream could serve a symbol; copied per call with the symbol filled in
+_DEFAULT_QUOTE = {
+    'current_price': 0,
+    'change': 0,
+    'change_percent': 0,
+    'volume': 0,
+    'high': 0,
+    'low': 0,
+    'open': 0,
+    'previous_close': 0,
+    'source': 'default'
+}
+
+# Upstox quote fields read per symbol; missing ones default to 0
+_UPSTOX_KEYS = ('ltp', 'change', 'change_percent', 'volume', 'high', 'low', 'open', 'previous_close')
+_UPSTOX_ZEROS = dict.fromkeys(_UPSTOX_KEYS, 0)
+_upstox_fields = itemgetter(*_UPSTOX_KEYS)
+
 class StockService:
+    __slots__ = ('upstox_api_key', 'upstox_base_url', 'fallback_to_yahoo', '_upstox_headers',
+                 '_upstox_failures', '_upstox_open_until', '_upstox_lock')
+    
     def __init__(self):
         self.upstox_api_key = os.getenv('UPSTOX_API_KEY')
         self.upstox_base_url = 'https://api.upstox.com/v2'
         self.fallback_to_yahoo = True
+        # Sent per request: the session is shared with yfinance, so the token must not live on it
+        self._upstox_headers = {
+            'Accept': 'application/json',
+            'Authorization': f'Bearer {self.upstox_api_key}'
+        }
+        self._upstox_failures = 0
+        self._upstox_open_until = 0.0
+        self._upstox_lock = threading.Lock()
         
     def get_stock_data(self, symbol: str) -> Dict[str, Any]:
         """
         Get stock data for a given symbol
         Tries Upstox first, falls back to Yahoo Finance
         """
+        data = get_json(self._quote_key(symbol))
+        if data is None:
+            # Concurrent misses for one symbol share a single upstream fetch
+            data = coalesce(self._quote_key(symbol), lambda: self._load_stock_data(symbol))
+        return data
+    
+    def _load_stock_data(self, symbol: str) -> Dict[str, Any]:
+        data = self._fetch_stock_data(symbol)
+        self._cache_quote(symbol, data)
+        return data
+    
+    def _fetch_stock_data(self, symbol: str) -> Dict[str, Any]:
+        """Fetch fresh stock data, bypassing the quote cache"""
         try:
             # Try Upstox API first
             if self.upstox_api_key:
@@ -35,43 +220,133 @@ class StockService:
             
         return self._get_default_data(symbol)
     
+    def get_stock_data_many(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get stock data for several symbols: one Upstox request, then concurrent fallbacks"""
+        if not symbols:
+            return {}
+        
+        results = {}
+        for symbol in symbols:
+            cached = get_json(self._quote_key(symbol))
+            if cached is not None:
+                results[symbol] = cached
+        
+        pending = [symbol for symbol in symbols if symbol not in results]
+        if pending:
+            fetched = self._get_upstox_data_batch(pending) if self.upstox_api_key else {}
+            
+            missing = [symbol for symbol in pending if symbol not in fetched]
+            if missing:
+                with ThreadPoolExecutor(max_workers=min(len(missing), 8)) as executor:
+                    fetched.update(zip(missing, executor.map(self._get_fallback_data, missing)))
+            
+            for symbol, data in fetched.items():
+                self._cache_quote(symbol, data)
+            results.update(fetched)
+        
+        return {symbol: results[symbol] for symbol in symbols}
+    
+    @staticmethod
+    def _quote_key(symbol: str) -> str:
+        return f"quote:{symbol}"
+    
+    def _cache_quote(self, symbol: str, data: Dict[str, Any]):
+        # Default data is left uncached so the next call retries the APIs
+        if data.get('source') != 'default':
+            set_json(self._quote_key(symbol), QUOTE_CACHE_TTL, data, default=float)
+    
+    def _get_fallback_data(self, symbol: str) -> Dict[str, Any]:
+        """Yahoo Finance data for a symbol Upstox could not serve"""
+        try:
+            if self.fallback_to_yahoo:
+                return self._get_yahoo_data(symbol)
+        except Exception as e:
+            logger.error(f"Error fetching stock data for {symbol}: {e}")
+        return self._get_default_data(symbol)
+    
     def _get_upstox_data(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Fetch data from Upstox API"""
+        return self._get_upstox_data_batch([symbol]).get(symbol)
+    
+    def _get_upstox_data_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch quotes for several symbols with a single Upstox request"""
+        if not self._claim_upstox_call():
+            return {}
+        
         try:
-            headers = {
-                'Accept': 'application/json',
-                'Authorization': f'Bearer {self.upstox_api_key}'
-            }
-            
-            # Get market quote
+            # Get market quotes; the endpoint takes a comma-separated list
             url = f"{self.upstox_base_url}/market-quote/ltp"
-            params = {'symbol': symbol}
-            
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Process the response
-            if 'data' in data and data['data']:
-                quote_data = data['data'][0]
-                return {
-                    'symbol': symbol,
-                    'current_price': quote_data.get('ltp', 0),
-                    'change': quote_data.get('change', 0),
-                    'change_percent': quote_data.get('change_percent', 0),
-                    'volume': quote_data.get('volume', 0),
-                    'high': quote_data.get('high', 0),
-                    'low': quote_data.get('low', 0),
-                    'open': quote_data.get('open', 0),
-                    'previous_close': quote_data.get('previous_close', 0),
-                    'source': 'upstox'
-                }
+            params = {'symbol': ','.join(symbols)}
+            
+            try:
+                response = _SESSION.get(url, headers=self._upstox_headers, params=params, timeout=10)
+                response.raise_for_status()
+            except Exception:
+                self._record_upstox_failure()
+                raise
+            self._record_upstox_success()
+            
+            data = orjson.loads(response.content).get('data') or {}
+            
+            # Quotes come back keyed by instrument ("NSE_EQ:INFY") or as a list in request order
+            if isinstance(data, dict):
+                quotes = {key.rsplit(':', 1)[-1].upper(): quote for key, quote in data.items()}
+            else:
+                quotes = {(quote.get('symbol') or symbol).upper(): quote for symbol, quote in zip(symbols, data)}
+            
+            return {
+                symbol: self._format_upstox_quote(symbol, quotes[symbol.upper()])
+                for symbol in symbols if symbol.upper() in quotes
+            }
                 
         except Exception as e:
-            logger.warning(f"Upstox API failed for {symbol}: {e}")
+            logger.warning(f"Upstox API failed for {', '.join(symbols)}: {e}")
             
-        return None
+        return {}
+    
+    def _claim_upstox_call(self) -> bool:
+        """False while the breaker is open; once the cooldown ends, only one caller gets to probe"""
+        with self._upstox_lock:
+            now = time.monotonic()
+            if now < self._upstox_open_until:
+                return False
+            if self._upstox_failures >= UPSTOX_FAILURE_THRESHOLD:
+                # Half-open: keep the others short-circuiting until this probe finishes
+                self._upstox_open_until = now + UPSTOX_COOLDOWN
+            return True
+    
+    def _record_upstox_failure(self):
+        with self._upstox_lock:
+            self._upstox_failures += 1
+            if self._upstox_failures >= UPSTOX_FAILURE_THRESHOLD:
+                if self._upstox_open_until == 0.0:
+                    logger.warning(f"Upstox failed {self._upstox_failures} times in a row, skipping it for {UPSTOX_COOLDOWN}s")
+                self._upstox_open_until = time.monotonic() + UPSTOX_COOLDOWN
+    
+    def _record_upstox_success(self):
+        with self._upstox_lock:
+            if self._upstox_open_until:
+                logger.info("Upstox is responding again")
+            self._upstox_failures = 0
+            self._upstox_open_until = 0.0
+    
+    def _format_upstox_quote(self, symbol: str, quote_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map an Upstox quote onto the stock data structure"""
+        ltp, change, change_percent, volume, high, low, open_, previous_close = _upstox_fields(
+            _UPSTOX_ZEROS | quote_data
+        )
+        return {
+            'symbol': symbol,
+            'current_price': ltp,
+            'change': change,
+            'change_percent': change_percent,
+            'volume': volume,
+            'high': high,
+            'low': low,
+            'open': open_,
+            'previous_close': previous_close,
+            'source': 'upstox'
+        }
     
     def _get_yahoo_data(self, symbol: str) -> Dict[str, Any]:
         """Fetch data from Yahoo Finance as fallback"""
@@ -80,23 +355,24 @@ class StockService:
             if not symbol.endswith('.NS') and not symbol.endswith('.BO'):
                 symbol = f"{symbol}.NS"
             
-            ticker = yf.Ticker(symbol)
-            # Accessing ticker.info can be slow/unreliable; avoid it
-            
-            # Get current price
-            hist = ticker.history(period="5d")
-            current_price = hist['Close'].iloc[-1] if not hist.empty else 0
+            # Get current price from the cached daily bars the indicators also use
+            hist = self.get_historical_data(symbol, days=HISTORY_DAYS)
+            close = hist['Close']
+            bars = len(close)
+            current_price = close[-1] if bars else 0
+            previous_close = close[-2] if bars > 1 else 0
+            change = current_price - previous_close if bars > 1 else 0
             
             return {
                 'symbol': symbol.replace('.NS', '').replace('.BO', ''),
                 'current_price': current_price,
-                'change': hist['Close'].iloc[-1] - hist['Close'].iloc[-2] if len(hist) > 1 else 0,
-                'change_percent': ((hist['Close'].iloc[-1] - hist['Close'].iloc[-2]) / hist['Close'].iloc[-2] * 100) if len(hist) > 1 else 0,
-                'volume': hist['Volume'].iloc[-1] if not hist.empty else 0,
-                'high': hist['High'].iloc[-1] if not hist.empty else 0,
-                'low': hist['Low'].iloc[-1] if not hist.empty else 0,
-                'open': hist['Open'].iloc[-1] if not hist.empty else 0,
-                'previous_close': hist['Close'].iloc[-2] if len(hist) > 1 else 0,
+                'change': change,
+                'change_percent': (change / previous_close * 100) if bars > 1 else 0,
+                'volume': int(hist['Volume'][-1]) if bars else 0,
+                'high': hist['High'][-1] if bars else 0,
+                'low': hist['Low'][-1] if bars else 0,
+                'open': hist['Open'][-1] if bars else 0,
+                'previous_close': previous_close,
                 'source': 'yahoo_finance'
             }
             
@@ -106,68 +382,134 @@ class StockService:
     
     def _get_default_data(self, symbol: str) -> Dict[str, Any]:
         """Return default data structure when APIs fail"""
-        return {
-            'symbol': symbol,
-            'current_price': 0,
-            'change': 0,
-            'change_percent': 0,
-            'volume': 0,
-            'high': 0,
-            'low': 0,
-            'open': 0,
-            'previous_close': 0,
-            'source': 'default'
-        }
+        return {'symbol': symbol, **_DEFAULT_QUOTE}
     
-    def get_historical_data(self, symbol: str, days: int = 30) -> pd.DataFrame:
-        """Get historical data for technical analysis"""
+    def get_historical_data(self, symbol: str, days: int = 30) -> Dict[str, np.ndarray]:
+        """Get daily bars for technical analysis as 'Date' plus OHLCV arrays, oldest first"""
         try:
             if not symbol.endswith('.NS') and not symbol.endswith('.BO'):
                 symbol = f"{symbol}.NS"
             
-            ticker = yf.Ticker(symbol)
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            
-            hist = ticker.history(start=start_date, end=end_date)
-            return hist
+            # Shorter requests are served from the shared window instead of their own download
+            window = max(days, HISTORY_DAYS)
+            key = f"bars:{symbol}:{window}:{date.today().isoformat()}"
+            bars = cached_pickle(key, HISTORY_CACHE_TTL, lambda: self._fetch_historical_data(symbol, window))
+            return bars if days >= window else self._last_days(bars, days)
             
         except Exception as e:
             logger.error(f"Error fetching historical data for {symbol}: {e}")
-            return pd.DataFrame()
+            return _empty_bars()
+    
+    def _fetch_historical_data(self, symbol: str, days: int) -> Dict[str, np.ndarray]:
+        """Download historical data from Yahoo Finance"""
+        try:
+            return self._fetch_yahoo_chart(symbol, days)
+        except Exception as e:
+            logger.warning(f"Yahoo chart API failed for {symbol}, using yfinance: {e}")
+        
+        ticker = yf.Ticker(symbol, session=_SESSION)
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        
+        hist = ticker.history(start=start_date, end=end_date, interval='1d')
+        if hist.empty:
+            return _empty_bars()
+        
+        # Keep the exchange's local dates; only the columns callers read are kept
+        index = hist.index.tz_localize(None) if hist.index.tz is not None else hist.index
+        bars = {'Date': index.to_numpy(dtype='datetime64[ns]')}
+        for column in _BAR_COLUMNS:
+            bars[column] = hist[column].to_numpy(dtype=np.float64)
+        return bars
+    
+    def _fetch_yahoo_chart(self, symbol: str, days: int) -> Dict[str, np.ndarray]:
+        """Download daily bars straight from Yahoo's chart endpoint, skipping yfinance's DataFrame layer"""
+        end = int(datetime.now().timestamp())
+        params = {'period1': end - days * 86400, 'period2': end, 'interval': '1d'}
+        response = _SESSION.get(_YAHOO_CHART_URL.format(symbol=symbol), params=params,
+                                headers=_YAHOO_HEADERS, timeout=10)
+        response.raise_for_status()
+        
+        result = orjson.loads(response.content)['chart']['result'][0]
+        timestamps = result.get('timestamp')
+        if not timestamps:
+            return _empty_bars()
+        
+        quote = result['indicators']['quote'][0]
+        # Missing bars come back as null; np.asarray turns them into NaN
+        columns = {column: np.asarray(quote[column.lower()], dtype=np.float64) for column in _BAR_COLUMNS}
+        
+        # Scale prices by the adjusted close, as yfinance's history() does by default
+        adjclose = result['indicators'].get('adjclose')
+        if adjclose:
+            ratio = np.asarray(adjclose[0]['adjclose'], dtype=np.float64) / columns['Close']
+            for column in ('Open', 'High', 'Low', 'Close'):
+                columns[column] *= ratio
+        
+        # Bar times are UTC; shift to the exchange's clock and keep the date, like the yfinance index
+        offset = result['meta'].get('gmtoffset', 0)
+        dates = (np.asarray(timestamps, dtype=np.int64) + offset).astype('datetime64[s]').astype('datetime64[D]')
+        
+        keep = ~np.isnan(columns['Close'])
+        bars = {'Date': dates[keep].astype('datetime64[ns]')}
+        for column in _BAR_COLUMNS:
+            bars[column] = columns[column][keep]
+        bars['Volume'] = np.nan_to_num(bars['Volume'])
+        return bars
+    
+    @staticmethod
+    def _last_days(bars: Dict[str, np.ndarray], days: int) -> Dict[str, np.ndarray]:
+        """Bars from the last `days` calendar days, as views into the full window"""
+        cutoff = np.datetime64(datetime.now() - timedelta(days=days), 'ns')
+        start = np.searchsorted(bars['Date'], cutoff)
+        return {column: values[start:] for column, values in bars.items()}
     
     def calculate_technical_indicators(self, symbol: str) -> Dict[str, float]:
         """Calculate technical indicators for a stock"""
         try:
-            hist_data = self.get_historical_data(symbol, days=50)
-            if hist_data.empty:
+            hist_data = self.get_historical_data(symbol, days=HISTORY_DAYS)
+            close = hist_data['Close']
+            if not len(close):
                 return {}
             
-            # Calculate RSI
-            delta = hist_data['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            
-            # Calculate Moving Averages
-            sma_20 = hist_data['Close'].rolling(window=20).mean()
-            sma_50 = hist_data['Close'].rolling(window=50).mean()
-            
-            # Calculate MACD
-            ema_12 = hist_data['Close'].ewm(span=12).mean()
-            ema_26 = hist_data['Close'].ewm(span=26).mean()
-            macd = ema_12 - ema_26
-            signal = macd.ewm(span=9).mean()
+            rsi, sma_20, sma_50, macd, signal = _indicator_core(close)
             
             return {
-                'rsi': rsi.iloc[-1] if not rsi.empty else 0,
-                'sma_20': sma_20.iloc[-1] if not sma_20.empty else 0,
-                'sma_50': sma_50.iloc[-1] if not sma_50.empty else 0,
-                'macd': macd.iloc[-1] if not macd.empty else 0,
-                'macd_signal': signal.iloc[-1] if not signal.empty else 0
+                'rsi': rsi,
+                'sma_20': sma_20,
+                'sma_50': sma_50,
+                'macd': macd,
+                'macd_signal': signal
             }
             
         except Exception as e:
             logger.error(f"Error calculating technical indicators for {symbol}: {e}")
             return {}
+
+    def calculate_technical_indicators_bulk(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        """Calculate technical indicators for several stocks with one kernel call"""
+        if not symbols:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(len(symbols), 8)) as executor:
+            closes = list(executor.map(self._history_close, symbols))
+        
+        # Histories differ in length, so they are packed end to end rather than padded
+        offsets = np.zeros(len(symbols) + 1, dtype=np.int64)
+        np.cumsum([len(close) for close in closes], out=offsets[1:])
+        try:
+            values = _indicator_bulk(np.concatenate(closes), offsets)
+        except Exception as e:
+            logger.error(f"Error calculating technical indicators for {', '.join(symbols)}: {e}")
+            return {symbol: {} for symbol in symbols}
+        
+        return {
+            symbol: dict(zip(_INDICATOR_KEYS, row.tolist())) if len(close) else {}
+            for symbol, close, row in zip(symbols, closes, values)
+        }
+    
+    def _history_close(self, symbol: str) -> np.ndarray:
+        return self.get_historical_data(symbol, days=HISTORY_DAYS)['Close']
+
+# Shared per-process instance
+stock_service = StockService()
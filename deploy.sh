@@ -83,7 +83,7 @@ echo "🌐 Backend will run on: http://localhost:5000"
 echo "🌐 Frontend will run on: http://localhost:3000"
 echo ""
 echo "🚀 For production deployment:"
-echo "- Backend: cd backend && gunicorn -w 4 -b 0.0.0.0:5000 app:app"
+echo "- Backend: cd backend && PORT=5000 gunicorn -c gunicorn_conf.py app:app"
 echo "- Frontend: cd frontend && npm run build (serve build folder)"
 echo ""
 echo "📚 Check README.md for detailed documentation"